@@ -12,6 +12,10 @@ python3 manage.py makemigrations
 echo "Migrating..."
 python3 manage.py migrate
 
+# Check the house scores for drift
+echo "Checking house scores..."
+python3 manage.py rebuild_house_scores --check
+
 # Collect static files
 echo "Collecting static files..."
 python3 manage.py collectstatic --noinput
\ No newline at end of file
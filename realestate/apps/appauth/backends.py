@@ -0,0 +1,25 @@
+# Django imports
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+# Get the user model
+UserModel = get_user_model()
+
+
+# Authentication backend that loads the role of the user with the user
+class RoleModelBackend(ModelBackend):
+    # Method to get the user for the session
+    def get_user(self, user_id):
+        # Get the user with the homebuyer, couple and realtor in a single query
+        try:
+            user = UserModel._default_manager.select_related(
+                "homebuyer__couple", "realtor"
+            ).get(pk=user_id)
+
+        # If the user does not exist, return None
+        except UserModel.DoesNotExist:
+            return None
+
+        # Return the user if the user can authenticate
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,19 @@
+# Middleware to resolve the role and couple of the user once per request
+class RoleMiddleware(object):
+    # Constructor
+    def __init__(self, get_response):
+        # Set the get response callable
+        self.get_response = get_response
+
+    # Method to handle the request
+    def __call__(self, request):
+        # Get the role of the authenticated user
+        role = request.user.role_object if request.user.is_authenticated else None
+
+        # Store the role and the couple of the homebuyer on the request
+        request.role = role
+        request.couple = getattr(role, "couple", None)
+        request.couple_id = getattr(role, "couple_id", None)
+
+        # Return the response
+        return self.get_response(request)
@@ -1,10 +1,16 @@
+# Import fractions
+import fractions
+
+
 # Django imports
 from django import forms
 
 
 # App imports
 from .models import Category
+from .models import CategoryComparison
 from realestate.apps.core.forms import CustomChoiceField
+from realestate.apps.core.models import Homebuyer
 
 
 # Form to edit the category weights
@@ -86,3 +92,70 @@ class CategoryDeleteForm(forms.Form):
         # Set the model and fields for the form
         model = Category
         fields = ["summary", "description"]
+
+
+# Form to compare the categories pairwise
+class CategoryComparisonForm(forms.Form):
+    # Set the labels of the comparison scale
+    _SCALE_LABELS = (
+        "Extremely more important",
+        "Very strongly more important",
+        "Strongly more important",
+        "Moderately more important",
+        "Equally important",
+        "Moderately less important",
+        "Strongly less important",
+        "Very strongly less important",
+        "Extremely less important",
+    )
+
+    # Add the weighting mode field
+    weighting_mode = forms.ChoiceField(
+        choices=Homebuyer._meta.get_field("weighting_mode").choices,
+        label="Weighting Mode",
+        widget=forms.Select(),
+    )
+
+    # Constructor
+    def __init__(self, *args, **kwargs):
+        # Get the compared category pairs with their values
+        pairs = kwargs.pop("pairs", [])
+
+        # Call the parent constructor
+        super(CategoryComparisonForm, self).__init__(*args, **kwargs)
+
+        # Get the choices of the comparison scale
+        choices = [
+            (str(fractions.Fraction(value).limit_denominator(9)), label)
+            for value, label in zip(CategoryComparison.SCALE, self._SCALE_LABELS)
+        ]
+
+        # Traverse the category pairs
+        for category, other, value in pairs:
+            # Get the choice closest to the value
+            initial = min(
+                zip(CategoryComparison.SCALE, choices),
+                key=lambda choice: abs(choice[0] - value),
+            )[1][0]
+
+            # Create a choice field for the pair
+            field = forms.ChoiceField(
+                initial=initial,
+                choices=choices,
+                label=f"{category.summary} compared with {other.summary}",
+                widget=forms.Select(),
+            )
+
+            # Set the compared category ids
+            field.pair = (category.id, other.id)
+
+            # Add the field to the form
+            self.fields[f"{category.id}_{other.id}"] = field
+
+    # Method to get the cleaned comparison values keyed by category pair
+    def comparisons(self):
+        return {
+            field.pair: float(fractions.Fraction(self.cleaned_data[name]))
+            for name, field in self.fields.items()
+            if hasattr(field, "pair")
+        }
@@ -0,0 +1,299 @@
+# Import random, statistics, time and uuid
+import random
+import statistics
+import time
+import uuid
+
+
+# Django imports
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+
+# App imports
+from realestate.apps.appauth.models import User
+from realestate.apps.categories.models import Category
+from realestate.apps.categories.models import CategoryWeight
+from realestate.apps.categories.models import Grade
+from realestate.apps.categories.models import HouseScore
+from realestate.apps.core.annotations import progress
+from realestate.apps.core.models import Couple
+from realestate.apps.core.models import Homebuyer
+from realestate.apps.core.models import Realtor
+from realestate.apps.house.models import House
+
+
+# Indexes tuned to the hot queries, dropped by the comparison run
+_TUNED_INDEXES = ("grade_evaluated_idx",)
+
+
+# Set the batch size of the seeding inserts
+_BATCH_SIZE = 1000
+
+
+# Command to benchmark the hot queries of the views
+class Command(BaseCommand):
+    # Set the help text
+    help = "Seed a large dataset in a rolled back transaction and print the query plans and timings of the hot queries."
+
+    # Method to add the arguments
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--couples", type=int, default=200, help="Number of couples to seed."
+        )
+        parser.add_argument(
+            "--houses", type=int, default=30, help="Number of houses per couple."
+        )
+        parser.add_argument(
+            "--categories",
+            type=int,
+            default=10,
+            help="Number of categories per couple.",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Number of times each query is timed.",
+        )
+        parser.add_argument(
+            "--compare",
+            action="store_true",
+            help="Also benchmark the queries with the tuned indexes dropped.",
+        )
+
+    # Protected method to seed the dataset, returning a realtor, couple, homebuyer and house to query
+    def _seed(self, couples, houses, categories):
+        # Get a tag to keep the seeded emails unique
+        tag = uuid.uuid4().hex[:8]
+
+        # Create the users of the realtor and the homebuyers
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"benchmark-{tag}-{index}@example.com",
+                    email=f"benchmark-{tag}-{index}@example.com",
+                    first_name="Benchmark",
+                    last_name=str(index),
+                    password="!",
+                )
+                for index in range(2 * couples + 1)
+            ],
+            batch_size=_BATCH_SIZE,
+        )
+
+        # Create the realtor and the couples
+        realtor = Realtor.objects.create(user=users[0])
+        couple_objects = Couple.objects.bulk_create(
+            [Couple(realtor=realtor) for _ in range(couples)], batch_size=_BATCH_SIZE
+        )
+
+        # Create two homebuyers for every couple
+        homebuyers = Homebuyer.objects.bulk_create(
+            [
+                Homebuyer(user=user, couple=couple_objects[index // 2])
+                for index, user in enumerate(users[1:])
+            ],
+            batch_size=_BATCH_SIZE,
+        )
+
+        # Create the houses and the categories of the couples
+        house_objects = House.objects.bulk_create(
+            [
+                House(couple=couple, nickname=f"House {index}", address="Address")
+                for couple in couple_objects
+                for index in range(houses)
+            ],
+            batch_size=_BATCH_SIZE,
+        )
+        category_objects = Category.objects.bulk_create(
+            [
+                Category(couple=couple, summary=f"Category {index}")
+                for couple in couple_objects
+                for index in range(categories)
+            ],
+            batch_size=_BATCH_SIZE,
+        )
+
+        # Get the score and weight choices
+        scores = list(dict(Grade._meta.get_field("score").choices))
+        weights = list(dict(CategoryWeight._meta.get_field("weight").choices))
+
+        # Create the weights and grades of every homebuyer, with half the grades evaluated
+        now = timezone.now()
+        for index, homebuyer in enumerate(homebuyers):
+            couple_index = index // 2
+            couple_categories = category_objects[
+                couple_index * categories : (couple_index + 1) * categories
+            ]
+            couple_houses = house_objects[
+                couple_index * houses : (couple_index + 1) * houses
+            ]
+            CategoryWeight.objects.bulk_create(
+                [
+                    CategoryWeight(
+                        homebuyer=homebuyer,
+                        category=category,
+                        weight=random.choice(weights),
+                    )
+                    for category in couple_categories
+                ]
+            )
+            Grade.objects.bulk_create(
+                [
+                    Grade(
+                        homebuyer=homebuyer,
+                        house=house,
+                        category=category,
+                        score=random.choice(scores),
+                        evaluated=now if random.random() < 0.5 else None,
+                    )
+                    for house in couple_houses
+                    for category in couple_categories
+                ],
+                batch_size=_BATCH_SIZE,
+            )
+
+        # Compute the house scores of the homebuyers
+        HouseScore.objects.refresh(homebuyers)
+
+        # Return the objects to query
+        return realtor, couple_objects[0], homebuyers[0], house_objects[0]
+
+    # Protected method to get the hot queries of the views
+    def _queries(self, realtor, couple, homebuyer, house):
+        return {
+            "report grades": Grade.objects.filter(homebuyer__couple=couple)
+            .order_by()
+            .values_list("house_id", "category_id", "homebuyer_id", "score"),
+            "report weights": CategoryWeight.objects.filter(homebuyer__couple=couple)
+            .order_by()
+            .values_list("category_id", "homebuyer_id", "weight"),
+            "eval grades": Grade.objects.filter(house=house, homebuyer=homebuyer)
+            .order_by()
+            .values_list("category_id", "score", "evaluated"),
+            "evaluated counts": Grade.objects.filter(homebuyer__couple=couple)
+            .evaluated()
+            .order_by()
+            .values("house_id", "homebuyer_id")
+            .annotate(count=Count("id")),
+            "weight list": CategoryWeight.objects.filter(homebuyer=homebuyer)
+            .order_by()
+            .values_list("category_id", "weight"),
+            "house scores": House.objects.with_scores(couple, homebuyer),
+            "client progress": Couple.objects.filter(realtor=realtor).annotate(
+                progress=progress()
+            ),
+        }
+
+    # Protected method to get the median time of a query in milliseconds
+    def _time(self, queryset, repeat):
+        # Run the query once to warm up the caches
+        list(queryset.all())
+
+        # List to store the timings
+        timings = []
+
+        # Run the query the given number of times
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1e3)
+
+        # Return the median timing
+        return statistics.median(timings)
+
+    # Protected method to get the plan of a query for a pass
+    def _explain(self, queryset, label):
+        # Get the sql of the query
+        sql, params = queryset.query.sql_with_params()
+
+        # Label the plan query, SQLite reuses cached plan statements across index changes
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"{connection.ops.explain_query_prefix()} {sql} /* {label} */", params
+            )
+
+            # Return the plan lines
+            return "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+
+    # Protected method to print the plans and timings of the queries
+    def _report(self, queries, repeat, label):
+        # Dictionary to store the timings
+        timings = {}
+
+        # Traverse the queries
+        for name, queryset in queries.items():
+            # Print the plan of the query
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{label}: {name}"))
+            self.stdout.write(self._explain(queryset, label))
+
+            # Time the query
+            timings[name] = self._time(queryset, repeat)
+
+        # Return the timings
+        return timings
+
+    # Protected method to refresh the planner statistics of the seeded tables inside the transaction
+    def _analyze(self):
+        # Get the tables of the queried models
+        tables = [
+            model._meta.db_table
+            for model in (Grade, CategoryWeight, HouseScore, House, Category, Couple)
+        ]
+
+        # Analyze the tables with the statement of the database vendor
+        with connection.cursor() as cursor:
+            if connection.vendor in ("sqlite", "postgresql"):
+                cursor.execute("ANALYZE")
+            elif connection.vendor == "mysql":
+                cursor.execute(
+                    f"ANALYZE TABLE {', '.join(map(connection.ops.quote_name, tables))}"
+                )
+
+    # Protected method to drop the tuned indexes inside the transaction
+    def _drop_tuned_indexes(self):
+        with connection.cursor() as cursor:
+            for name in _TUNED_INDEXES:
+                cursor.execute(f"DROP INDEX {connection.ops.quote_name(name)}")
+
+    # Method to handle the command
+    def handle(self, *args, **options):
+        # Get the number of repeats
+        repeat = options["repeat"]
+
+        # Seed and query in a transaction that is always rolled back
+        with transaction.atomic():
+            # Seed the dataset
+            self.stdout.write(f"Seeding on {connection.vendor}...")
+            objects = self._seed(
+                options["couples"], options["houses"], options["categories"]
+            )
+            queries = self._queries(*objects)
+
+            # Refresh the planner statistics, so the plans fit the seeded dataset
+            self._analyze()
+
+            # Benchmark the queries with the tuned indexes
+            tuned = self._report(queries, repeat, "Tuned")
+
+            # If comparing with the tuned indexes dropped
+            untuned = {}
+            if options["compare"]:
+                self._drop_tuned_indexes()
+                self._analyze()
+                untuned = self._report(queries, repeat, "Untuned")
+
+            # Roll back the seeded dataset and the dropped indexes
+            transaction.set_rollback(True)
+
+        # Report the timings
+        self.stdout.write(f"{'Query':<20}{'Tuned':>12}{'Untuned':>12}")
+        for name, timing in tuned.items():
+            untuned_timing = (
+                f"{untuned[name]:>9.2f} ms" if name in untuned else f"{'-':>12}"
+            )
+            self.stdout.write(f"{name:<20}{timing:>9.2f} ms{untuned_timing}")
@@ -0,0 +1,101 @@
+# Import time
+import time
+
+
+# Django imports
+from django.contrib.admin.models import LogEntry
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.db import models
+from django.db import transaction
+
+
+# App imports
+from realestate.apps.appauth.models import User
+from realestate.apps.categories.models import _BACKFILL_SENDERS
+
+
+# Set the dispatch uid for the unscoped receiver
+_UNSCOPED_DISPATCH_UID = "benchmark_signal_dispatch_unscoped"
+
+
+# Function replicating the backfill receiver as it was before it was scoped to its senders
+def _unscoped_receiver(sender, instance, created, **kwargs):
+    # Skip the senders that are handled by the scoped receiver
+    if sender in _BACKFILL_SENDERS:
+        return
+
+    # Open a transaction for every other save, like the unscoped receiver did
+    with transaction.atomic():
+        pass
+
+
+# Command to benchmark the post save dispatch overhead
+class Command(BaseCommand):
+    # Set the help text
+    help = "Benchmark the per-save post_save overhead of the categories receivers for unrelated models."
+
+    # Method to add the arguments
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--saves",
+            type=int,
+            default=10000,
+            help="Number of post_save signals to send per model.",
+        )
+
+    # Protected method to time the post save dispatch for a sender in microseconds
+    def _time_dispatch(self, sender, saves):
+        # Create an unsaved instance of the sender
+        instance = sender()
+
+        # Send the post save signal the given number of times
+        start = time.perf_counter()
+        for _ in range(saves):
+            models.signals.post_save.send(
+                sender=sender,
+                instance=instance,
+                created=False,
+                update_fields=None,
+                raw=False,
+                using="default",
+            )
+
+        # Return the average time per save
+        return (time.perf_counter() - start) / saves * 1e6
+
+    # Method to handle the command
+    def handle(self, *args, **options):
+        # Get the number of saves and the unrelated senders
+        saves = options["saves"]
+        senders = (User, Session, LogEntry)
+
+        # Time the dispatch with the receivers scoped to their senders
+        scoped = {sender: self._time_dispatch(sender, saves) for sender in senders}
+
+        # Connect the unscoped receiver to every sender
+        models.signals.post_save.connect(
+            _unscoped_receiver, dispatch_uid=_UNSCOPED_DISPATCH_UID
+        )
+
+        # Time the dispatch with the unscoped receiver
+        try:
+            unscoped = {
+                sender: self._time_dispatch(sender, saves) for sender in senders
+            }
+
+        # Disconnect the unscoped receiver
+        finally:
+            models.signals.post_save.disconnect(dispatch_uid=_UNSCOPED_DISPATCH_UID)
+
+        # Report the overhead per save
+        self.stdout.write(
+            f"{'Sender':<12}{'Scoped':>14}{'Unscoped':>14}{'Removed':>14}"
+        )
+        for sender in senders:
+            self.stdout.write(
+                f"{sender.__name__:<12}"
+                f"{scoped[sender]:>11.2f} us"
+                f"{unscoped[sender]:>11.2f} us"
+                f"{unscoped[sender] - scoped[sender]:>11.2f} us"
+            )
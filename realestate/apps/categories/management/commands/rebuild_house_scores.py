@@ -0,0 +1,91 @@
+# Django imports
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+
+
+# App imports
+from realestate.apps.categories.models import HouseScore
+from realestate.apps.core.models import Couple
+from realestate.apps.core.models import Homebuyer
+
+
+# Command to rebuild the house scores
+class Command(BaseCommand):
+    # Set the help text
+    help = "Rebuild the house score table from the grades and weights and check it for drift."
+
+    # Method to add the arguments
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Only report the drifted house scores without rebuilding the table.",
+        )
+
+    # Method to handle the command
+    def handle(self, *args, **options):
+        # Get the expected house scores for all the homebuyers
+        expected = HouseScore.objects.expected(Homebuyer.objects.all())
+
+        # Get the stored house scores
+        stored = {
+            (house_id, homebuyer_id): (total, graded)
+            for house_id, homebuyer_id, total, graded in HouseScore.objects.values_list(
+                "house_id", "homebuyer_id", "total", "graded"
+            )
+        }
+
+        # Get the house scores that are missing, stale or wrong
+        drifted = [
+            key
+            for key in expected.keys() | stored.keys()
+            if expected.get(key) != stored.get(key)
+        ]
+
+        # Report the drift
+        self.stdout.write(f"{len(drifted)} of {len(expected)} house scores drifted.")
+
+        # If only checking for drift
+        if options["check"]:
+            # If the house scores drifted
+            if drifted:
+                # Raise a command error
+                raise CommandError(
+                    "House scores have drifted, run without --check to rebuild them."
+                )
+
+            # Return
+            return
+
+        # If no house score drifted, there is nothing to rebuild
+        if not drifted:
+            # Return
+            return
+
+        # Rebuild the table in a transaction
+        with transaction.atomic():
+            # Delete all the house scores
+            HouseScore.objects.all().delete()
+
+            # Bulk create the expected house scores
+            HouseScore.objects.bulk_create(
+                [
+                    HouseScore(
+                        house_id=house_id,
+                        homebuyer_id=homebuyer_id,
+                        total=total,
+                        graded=graded,
+                    )
+                    for (house_id, homebuyer_id), (total, graded) in expected.items()
+                ],
+                batch_size=1000,
+            )
+
+            # Bump the versions of the couples whose house scores drifted to drop their cached data
+            Couple.objects.filter(
+                homebuyer__in={homebuyer_id for _, homebuyer_id in drifted}
+            ).bump_version()
+
+        # Send a success message
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(expected)} house scores."))
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.6 on 2026-10-18 05:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+# Fill the house scores of the existing homebuyers, one couple at a time
+def fill_house_scores(apps, schema_editor):
+    Category = apps.get_model('categories', 'Category')
+    CategoryWeight = apps.get_model('categories', 'CategoryWeight')
+    Couple = apps.get_model('core', 'Couple')
+    Grade = apps.get_model('categories', 'Grade')
+    Homebuyer = apps.get_model('core', 'Homebuyer')
+    House = apps.get_model('house', 'House')
+    HouseScore = apps.get_model('categories', 'HouseScore')
+
+    # Missing grades and weights are read as the default score and weight
+    default_score = Grade._meta.get_field('score').default
+    default_weight = CategoryWeight._meta.get_field('weight').default
+
+    for couple_id in Couple.objects.values_list('id', flat=True).iterator():
+        category_ids = list(Category.objects.filter(couple_id=couple_id).values_list('id', flat=True))
+        house_ids = list(House.objects.filter(couple_id=couple_id).values_list('id', flat=True))
+        for homebuyer_id in Homebuyer.objects.filter(couple_id=couple_id).values_list('id', flat=True):
+            weights = dict(CategoryWeight.objects.filter(homebuyer_id=homebuyer_id).values_list('category_id', 'weight'))
+            grades = {
+                (house_id, category_id): score
+                for house_id, category_id, score in Grade.objects.filter(homebuyer_id=homebuyer_id).values_list('house_id', 'category_id', 'score')
+            }
+            HouseScore.objects.bulk_create([
+                HouseScore(
+                    house_id=house_id,
+                    homebuyer_id=homebuyer_id,
+                    total=sum(
+                        grades.get((house_id, category_id), default_score) * weights.get(category_id, default_weight)
+                        for category_id in category_ids
+                    ),
+                    graded=sum((house_id, category_id) in grades for category_id in category_ids),
+                )
+                for house_id in house_ids
+            ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+        ('house', '0001_initial'),
+        ('categories', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HouseScore',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('total', models.IntegerField(default=0, verbose_name='Total')),
+                ('graded', models.PositiveIntegerField(default=0, verbose_name='Graded')),
+                ('homebuyer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.homebuyer', verbose_name='Homebuyer')),
+                ('house', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='house.house', verbose_name='House')),
+            ],
+            options={
+                'verbose_name': 'House Score',
+                'verbose_name_plural': 'House Scores',
+                'ordering': ['house', 'homebuyer'],
+                'unique_together': {('house', 'homebuyer')},
+            },
+        ),
+        migrations.RunPython(fill_house_scores, migrations.RunPython.noop),
+    ]
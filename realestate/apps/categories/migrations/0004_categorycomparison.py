@@ -0,0 +1,74 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:13
+
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_homebuyer_weighting_mode"),
+        ("categories", "0003_housescore"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CategoryComparison",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "value",
+                    models.FloatField(
+                        default=1,
+                        validators=[
+                            django.core.validators.MinValueValidator(
+                                0.1111111111111111
+                            ),
+                            django.core.validators.MaxValueValidator(9),
+                        ],
+                        verbose_name="Value",
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="categories.category",
+                        verbose_name="Category",
+                    ),
+                ),
+                (
+                    "homebuyer",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="core.homebuyer",
+                        verbose_name="Homebuyer",
+                    ),
+                ),
+                (
+                    "other",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="categories.category",
+                        verbose_name="Other Category",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Category Comparison",
+                "verbose_name_plural": "Category Comparisons",
+                "ordering": ["homebuyer", "category", "other"],
+                "unique_together": {("homebuyer", "category", "other")},
+            },
+        ),
+    ]
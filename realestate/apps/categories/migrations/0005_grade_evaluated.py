@@ -0,0 +1,33 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:22
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Mark the grades that differ from the default score as evaluated
+def mark_evaluated_grades(apps, schema_editor):
+    Grade = apps.get_model("categories", "Grade")
+    Grade.objects.exclude(score=3).update(evaluated=timezone.now())
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("categories", "0004_categorycomparison"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="grade",
+            name="evaluated",
+            field=models.DateTimeField(blank=True, null=True, verbose_name="Evaluated"),
+        ),
+        migrations.AddIndex(
+            model_name="grade",
+            index=models.Index(
+                condition=models.Q(("evaluated__isnull", False)),
+                fields=["homebuyer", "house"],
+                name="grade_evaluated_idx",
+            ),
+        ),
+        migrations.RunPython(mark_evaluated_grades, migrations.RunPython.noop),
+    ]
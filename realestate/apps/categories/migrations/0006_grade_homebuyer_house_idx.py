@@ -0,0 +1,19 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("categories", "0005_grade_evaluated"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="grade",
+            index=models.Index(
+                fields=["homebuyer", "house", "category", "score"],
+                name="grade_homebuyer_house_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.6 on 2026-10-18 07:01
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+# Date the existing categorys with the creation time of their couple, not the migration time
+def date_existing_categorys(apps, schema_editor):
+    Couple = apps.get_model("core", "Couple")
+    Category = apps.get_model("categories", "Category")
+    Category.objects.update(
+        created=Subquery(
+            Couple.objects.filter(id=OuterRef("couple_id")).values("created")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("categories", "0006_grade_homebuyer_house_idx"),
+        ("core", "0002_couple_created"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="created",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                verbose_name="Created",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(date_existing_categorys, migrations.RunPython.noop),
+    ]
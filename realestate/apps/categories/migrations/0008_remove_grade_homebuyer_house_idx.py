@@ -0,0 +1,16 @@
+# Generated by Django 4.2.6 on 2026-10-18 07:12
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("categories", "0007_category_created"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="grade",
+            name="grade_homebuyer_house_idx",
+        ),
+    ]
@@ -1,9 +1,26 @@
+# Import collections, itertools, threading and weakref
+import collections
+import itertools
+import threading
+import weakref
+
+
 # Django imports
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator
 from django.core.validators import MinValueValidator
 from django.db import models
 from django.db import transaction
+from django.db.models import Case
+from django.db.models import Count
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models import Sum
+from django.db.models import Value
+from django.db.models import When
+from django.db.models.functions import Coalesce
 from django.dispatch import receiver
 
 
@@ -43,6 +60,21 @@ _DEFAULT_CATEGORIES = [
 ]
 
 
+# Number of grades to create per query when backfilling
+_GRADE_BATCH_SIZE = 1000
+
+
+# Thread local storage of the backfill buffers waiting for their transaction to commit
+_pending_backfills = threading.local()
+
+
+# Queryset for the categories
+class CategoryQuerySet(models.QuerySet):
+    # Method to get the categories of the couple of the user
+    def for_user(self, user):
+        return self.filter(couple__homebuyer__user=user)
+
+
 # Model for the categories
 class Category(BaseModel):
     # Set the minimum length for the summary
@@ -52,11 +84,17 @@ class Category(BaseModel):
     summary = models.CharField(max_length=128, verbose_name="Summary")
     description = models.TextField(blank=True, verbose_name="Description")
 
+    # Date time field for the creation time
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Created")
+
     # Create a foreign key to the couple
     couple = models.ForeignKey(
         "core.Couple", verbose_name="Couple", on_delete=models.CASCADE
     )
 
+    # Set the manager for the model
+    objects = CategoryQuerySet.as_manager()
+
     # String representation
     def __str__(self):
         return f"{self.summary} - {self.couple}"
@@ -82,6 +120,76 @@ class Category(BaseModel):
         verbose_name_plural = "Categories"
 
 
+# Function to refresh the house scores of the homebuyers and bump the versions of their couples
+def _refresh_house_scores(homebuyer_ids, house_ids=None):
+    # If no homebuyer is affected, return
+    if not homebuyer_ids:
+        return
+
+    # Recompute the house scores of the homebuyers
+    HouseScore.objects.refresh(
+        Homebuyer.objects.filter(id__in=homebuyer_ids), house_ids=house_ids
+    )
+
+    # Bump the versions of their couples
+    Couple.objects.filter(homebuyer__in=homebuyer_ids).bump_version()
+
+
+# Queryset for the category weights, keeping the house scores up to date on bulk writes
+class CategoryWeightQuerySet(models.QuerySet):
+    # Set the fields that change the house scores
+    _SCORED_FIELDS = {"weight", "homebuyer", "homebuyer_id", "category", "category_id"}
+
+    # Protected method to get the ids of the weights and their homebuyers
+    def _homebuyer_ids(self):
+        return dict(self.order_by().values_list("id", "homebuyer_id"))
+
+    # Method to delete the weights and refresh the house scores of their homebuyers
+    def delete(self):
+        # Get the homebuyers of the weights
+        homebuyer_ids = set(self._homebuyer_ids().values())
+
+        # Call the method from the parent class
+        deleted = super(CategoryWeightQuerySet, self).delete()
+
+        # Refresh the house scores of the homebuyers
+        _refresh_house_scores(homebuyer_ids)
+
+        # Return the deleted counts
+        return deleted
+
+    # Method to update the weights and refresh the house scores of their homebuyers
+    def update(self, **kwargs):
+        # If the update does not change the house scores
+        if not kwargs.keys() & self._SCORED_FIELDS:
+            # Call the method from the parent class
+            return super(CategoryWeightQuerySet, self).update(**kwargs)
+
+        # Get the weights and their homebuyers before the update
+        homebuyers = self._homebuyer_ids()
+
+        # Call the method from the parent class
+        updated = super(CategoryWeightQuerySet, self).update(**kwargs)
+
+        # Refresh the house scores of the homebuyers before and after the update
+        _refresh_house_scores(
+            set(homebuyers.values())
+            | set(
+                CategoryWeight.objects.filter(id__in=homebuyers).values_list(
+                    "homebuyer_id", flat=True
+                )
+            )
+        )
+
+        # Return the updated count
+        return updated
+
+    # Keep the methods on the queryset only, like the parent class
+    delete.alters_data = True
+    delete.queryset_only = True
+    update.alters_data = True
+
+
 # Model for the category weights
 class CategoryWeight(BaseModel):
     # Add the fields to the model
@@ -108,6 +216,9 @@ class CategoryWeight(BaseModel):
         "categories.Category", verbose_name="Category", on_delete=models.CASCADE
     )
 
+    # Set the manager for the model
+    objects = CategoryWeightQuerySet.as_manager()
+
     # String representation
     def __str__(self):
         return f"{self.homebuyer} gives {self.category} a weight of {self.weight}."
@@ -134,6 +245,37 @@ class CategoryWeight(BaseModel):
         # Call the method from the parent class
         return super(CategoryWeight, self).clean()
 
+    # Class method to keep track of the weight loaded from the database
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Get the instance from the parent class
+        instance = super(CategoryWeight, cls).from_db(db, field_names, values)
+
+        # Store the loaded weight
+        instance._loaded_weight = dict(zip(field_names, values)).get("weight")
+
+        # Return the instance
+        return instance
+
+    # Method to delete the weight, remove it from the house scores and bump the version of the couple, cascaded deletes are handled by the parents
+    def delete(self, *args, **kwargs):
+        # Get the weight loaded from the database
+        weight = getattr(self, "_loaded_weight", self.weight)
+
+        # Call the method from the parent class
+        deleted = super(CategoryWeight, self).delete(*args, **kwargs)
+
+        # Remove the weight from the house scores
+        HouseScore.objects.apply_weight_changes(
+            self.homebuyer_id, {self.category_id: (weight, None)}
+        )
+
+        # Bump the version of the couple
+        Couple.objects.filter(homebuyer=self.homebuyer_id).bump_version()
+
+        # Return the deleted counts
+        return deleted
+
     # Meta class
     class Meta:
         # Set the field ordering
@@ -147,6 +289,178 @@ class CategoryWeight(BaseModel):
         verbose_name_plural = "Category Weights"
 
 
+# Model for the pairwise category comparisons
+class CategoryComparison(BaseModel):
+    # Set the scale of the comparison values, from extremely more to extremely less important
+    SCALE = (9, 7, 5, 3, 1, 1 / 3, 1 / 5, 1 / 7, 1 / 9)
+
+    # Add the fields to the model
+    value = models.FloatField(
+        default=1,
+        validators=[MinValueValidator(1 / 9), MaxValueValidator(9)],
+        verbose_name="Value",
+    )
+
+    # Create a foreign key to the homebuyer
+    homebuyer = models.ForeignKey(
+        "core.Homebuyer", verbose_name="Homebuyer", on_delete=models.CASCADE
+    )
+
+    # Create foreign keys to the compared categories
+    category = models.ForeignKey(
+        "categories.Category", verbose_name="Category", on_delete=models.CASCADE
+    )
+    other = models.ForeignKey(
+        "categories.Category",
+        verbose_name="Other Category",
+        on_delete=models.CASCADE,
+        related_name="+",
+    )
+
+    # String representation
+    def __str__(self):
+        return f"{self.homebuyer} finds {self.category} {self.value:g} times as important as {self.other}."
+
+    # Method to clean the fields
+    def clean(self):
+        # Get the foreign key ids
+        foreign_key_ids = (self.homebuyer_id, self.category_id, self.other_id)
+
+        # If any of the foreign keys are None
+        if not all(foreign_key_ids):
+            # Raise a validation error
+            raise ValidationError(
+                "Homebuyer and both Categories must exist before saving a CategoryComparison instance."
+            )
+
+        # If the category is compared with itself
+        if self.category_id == self.other_id:
+            # Raise a validation error
+            raise ValidationError("A Category cannot be compared with itself.")
+
+        # Get the unique couple ids
+        couple_ids = set(
+            [self.homebuyer.couple_id, self.category.couple_id, self.other.couple_id]
+        )
+
+        # If the homebuyer and categories are not for the same couple
+        if len(couple_ids) > 1:
+            # Raise a validation error
+            raise ValidationError("Categories are for a different Homebuyer.")
+
+        # Call the method from the parent class
+        return super(CategoryComparison, self).clean()
+
+    # Method to delete the comparison and bump the version of the couple, cascaded deletes are handled by the parents
+    def delete(self, *args, **kwargs):
+        # Call the method from the parent class
+        deleted = super(CategoryComparison, self).delete(*args, **kwargs)
+
+        # Bump the version of the couple
+        Couple.objects.filter(homebuyer=self.homebuyer_id).bump_version()
+
+        # Return the deleted counts
+        return deleted
+
+    # Meta class
+    class Meta:
+        # Set the field ordering
+        ordering = ["homebuyer", "category", "other"]
+
+        # Set the unique together constraint
+        unique_together = (("homebuyer", "category", "other"),)
+
+        # Set the verbose names
+        verbose_name = "Category Comparison"
+        verbose_name_plural = "Category Comparisons"
+
+
+# Queryset for the grades, keeping the house scores up to date on bulk writes
+class GradeQuerySet(models.QuerySet):
+    # Set the fields that change the house scores
+    _SCORED_FIELDS = {
+        "score",
+        "house",
+        "house_id",
+        "homebuyer",
+        "homebuyer_id",
+        "category",
+        "category_id",
+    }
+
+    # Method to get the grades a homebuyer has evaluated, not the default grades
+    def evaluated(self):
+        return self.filter(evaluated__isnull=False)
+
+    # Method to count the evaluated grades of each house and homebuyer
+    def evaluated_counts(self):
+        return {
+            (house_id, homebuyer_id): count
+            for house_id, homebuyer_id, count in self.evaluated()
+            .order_by()
+            .values("house_id", "homebuyer_id")
+            .annotate(count=Count("id"))
+            .values_list("house_id", "homebuyer_id", "count")
+        }
+
+    # Protected method to get the ids of the grades and their homebuyers and houses
+    def _homebuyer_houses(self):
+        return {
+            grade_id: (homebuyer_id, house_id)
+            for grade_id, homebuyer_id, house_id in self.order_by().values_list(
+                "id", "homebuyer_id", "house_id"
+            )
+        }
+
+    # Protected method to refresh the house scores of the homebuyer and house pairs
+    def _refresh(self, pairs):
+        _refresh_house_scores(
+            {homebuyer_id for homebuyer_id, _ in pairs},
+            house_ids={house_id for _, house_id in pairs},
+        )
+
+    # Method to delete the grades and refresh the house scores of their houses
+    def delete(self):
+        # Get the homebuyers and houses of the grades
+        pairs = set(self._homebuyer_houses().values())
+
+        # Call the method from the parent class
+        deleted = super(GradeQuerySet, self).delete()
+
+        # Refresh the house scores of the homebuyers and houses
+        self._refresh(pairs)
+
+        # Return the deleted counts
+        return deleted
+
+    # Method to update the grades and refresh the house scores of their houses
+    def update(self, **kwargs):
+        # If the update does not change the house scores
+        if not kwargs.keys() & self._SCORED_FIELDS:
+            # Call the method from the parent class
+            return super(GradeQuerySet, self).update(**kwargs)
+
+        # Get the grades and their homebuyers and houses before the update
+        grades = self._homebuyer_houses()
+
+        # Call the method from the parent class
+        updated = super(GradeQuerySet, self).update(**kwargs)
+
+        # Refresh the house scores of the homebuyers and houses before and after the update
+        self._refresh(
+            set(grades.values())
+            | set(Grade.objects.filter(id__in=grades)._homebuyer_houses().values())
+        )
+
+        # Return the updated count
+        return updated
+
+    # Keep the methods on the queryset only, like the parent class
+    delete.alters_data = True
+    delete.queryset_only = True
+    update.alters_data = True
+
+
 # Model for the grades
 class Grade(BaseModel):
     # Add the fields to the model
@@ -177,6 +491,12 @@ class Grade(BaseModel):
         "core.Homebuyer", verbose_name="Homebuyer", on_delete=models.CASCADE
     )
 
+    # Date time field for the time of the evaluation, none for the default grades
+    evaluated = models.DateTimeField(null=True, blank=True, verbose_name="Evaluated")
+
+    # Set the manager for the model
+    objects = GradeQuerySet.as_manager()
+
     # String representation
     def __str__(self):
         return f"{self.homebuyer.full_name} gives {str(self.house)} a score of {self.score} for category: '{str(self.category)}'"
@@ -208,99 +528,685 @@ class Grade(BaseModel):
         # Call the method from the parent class
         return super(Grade, self).clean()
 
+    # Class method to keep track of the score loaded from the database
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Get the instance from the parent class
+        instance = super(Grade, cls).from_db(db, field_names, values)
+
+        # Store the loaded score
+        instance._loaded_score = dict(zip(field_names, values)).get("score")
+
+        # Return the instance
+        return instance
+
+    # Method to delete the grade, remove it from the house score and bump the version of the couple, cascaded deletes are handled by the parents
+    def delete(self, *args, **kwargs):
+        # Get the score loaded from the database
+        score = getattr(self, "_loaded_score", self.score)
+
+        # Call the method from the parent class
+        deleted = super(Grade, self).delete(*args, **kwargs)
+
+        # Remove the score from the house score
+        HouseScore.objects.apply_grade_changes(
+            self.homebuyer_id, self.house_id, {self.category_id: (score, None)}
+        )
+
+        # Bump the version of the couple
+        Couple.objects.filter(homebuyer=self.homebuyer_id).bump_version()
+
+        # Return the deleted counts
+        return deleted
+
     class Meta:
         ordering = ["homebuyer", "house", "category", "score"]
         unique_together = (("house", "category", "homebuyer"),)
+        indexes = [
+            models.Index(
+                fields=["homebuyer", "house"],
+                condition=models.Q(evaluated__isnull=False),
+                name="grade_evaluated_idx",
+            ),
+        ]
         verbose_name = "Grade"
         verbose_name_plural = "Grades"
 
 
-# Create a post save receiver to add default categories
-@receiver(models.signals.post_save)
-def _add_default_categories(sender, instance, created, **kwargs):
-    # If a new couple is created
-    if created and sender == Couple:
-        # Get the couple
-        couple = instance
-
-        # Create a list of categories
-        categories = [
-            Category(couple_id=couple.id, **category_data)
-            for category_data in _DEFAULT_CATEGORIES
-        ]
+# Function to get the weight a homebuyer gives a category inside a query
+def _weight_subquery(homebuyer, category):
+    # Get the default weight
+    default_weight = CategoryWeight._meta.get_field("weight").default
+
+    # Return the weight or the default weight if it is missing
+    return Coalesce(
+        Subquery(
+            CategoryWeight.objects.filter(
+                homebuyer=homebuyer, category=category
+            ).values("weight")[:1]
+        ),
+        default_weight,
+    )
+
+
+# Manager for the house scores
+class HouseScoreManager(models.Manager):
+    # Protected method to get the default score and weight
+    def _defaults(self):
+        return (
+            Grade._meta.get_field("score").default,
+            CategoryWeight._meta.get_field("weight").default,
+        )
+
+    # Method to compute the expected house scores from the grades and weights
+    def expected(self, homebuyers, house_ids=None):
+        # Get the default score and weight
+        default_score, default_weight = self._defaults()
+
+        # Map the homebuyers to their couples
+        couples = {homebuyer.id: homebuyer.couple_id for homebuyer in homebuyers}
+
+        # Get the number of categories for each couple
+        category_counts = dict(
+            Category.objects.filter(couple_id__in=set(couples.values()))
+            .values("couple_id")
+            .annotate(count=Count("id"))
+            .values_list("couple_id", "count")
+        )
+
+        # Get the weight totals for each homebuyer
+        weight_totals = {
+            row["homebuyer_id"]: row
+            for row in CategoryWeight.objects.filter(homebuyer_id__in=couples)
+            .values("homebuyer_id")
+            .annotate(total=Sum("weight"), count=Count("id"))
+        }
+
+        # Compute the score of a house without any grades for each homebuyer
+        base_totals = {}
+        for homebuyer_id, couple_id in couples.items():
+            weights = weight_totals.get(homebuyer_id, {"total": 0, "count": 0})
+            missing = category_counts.get(couple_id, 0) - weights["count"]
+            base_totals[homebuyer_id] = default_score * (
+                weights["total"] + default_weight * missing
+            )
+
+        # Get the houses of the couples
+        house_filter = House.objects.filter(couple_id__in=set(couples.values()))
+        if house_ids is not None:
+            house_filter = house_filter.filter(id__in=house_ids)
+        house_couples = house_filter.values_list("id", "couple_id")
+
+        # Get the weighted difference from the default score for each house
+        grade_filter = Grade.objects.filter(homebuyer_id__in=couples)
+        if house_ids is not None:
+            grade_filter = grade_filter.filter(house_id__in=house_ids)
+        grade_totals = {
+            (row["house_id"], row["homebuyer_id"]): row
+            for row in grade_filter.values("house_id", "homebuyer_id").annotate(
+                delta=Sum(
+                    (F("score") - default_score)
+                    * _weight_subquery(OuterRef("homebuyer"), OuterRef("category"))
+                ),
+                graded=Count("id"),
+            )
+        }
+
+        # Combine the base scores with the graded differences
+        expected = {}
+        for house_id, couple_id in house_couples:
+            for homebuyer_id, homebuyer_couple_id in couples.items():
+                if homebuyer_couple_id == couple_id:
+                    grades = grade_totals.get(
+                        (house_id, homebuyer_id), {"delta": 0, "graded": 0}
+                    )
+                    expected[(house_id, homebuyer_id)] = (
+                        base_totals[homebuyer_id] + grades["delta"],
+                        grades["graded"],
+                    )
+
+        # Return the expected scores
+        return expected
+
+    # Method to recompute the house scores of the homebuyers
+    def refresh(self, homebuyers, house_ids=None):
+        # Get the homebuyers
+        homebuyers = list(homebuyers)
+
+        # Get the expected scores
+        expected = self.expected(homebuyers, house_ids=house_ids)
+
+        # Remove the scores of houses that do not belong to the couple
+        self.filter(homebuyer__in=homebuyers).exclude(
+            house__couple=F("homebuyer__couple")
+        ).delete()
+
+        # Upsert the expected scores
+        self.bulk_create(
+            [
+                self.model(
+                    house_id=house_id,
+                    homebuyer_id=homebuyer_id,
+                    total=total,
+                    graded=graded,
+                )
+                for (house_id, homebuyer_id), (total, graded) in expected.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["house", "homebuyer"],
+            update_fields=["total", "graded"],
+        )
+
+    # Method to apply grade changes of a homebuyer for a house
+    def apply_grade_changes(self, homebuyer_id, house_id, changes):
+        # Get the default score and weight
+        default_score, default_weight = self._defaults()
+
+        # Keep only the changes of (old score, new score) with None for missing grades
+        changes = {
+            category_id: (old_score, new_score)
+            for category_id, (old_score, new_score) in changes.items()
+            if old_score != new_score
+        }
+
+        # If nothing changed, return
+        if not changes:
+            return
+
+        # Get the weights of the changed categories
+        weights = dict(
+            CategoryWeight.objects.filter(
+                homebuyer_id=homebuyer_id, category_id__in=changes
+            )
+            .order_by()
+            .values_list("category_id", "weight")
+        )
+
+        # Compute the total and graded count deltas
+        total_delta = 0
+        graded_delta = 0
+        for category_id, (old_score, new_score) in changes.items():
+            # Read missing grades as the default score
+            old_value = default_score if old_score is None else old_score
+            new_value = default_score if new_score is None else new_score
+
+            # Update the deltas
+            total_delta += (new_value - old_value) * weights.get(
+                category_id, default_weight
+            )
+            graded_delta += (new_score is not None) - (old_score is not None)
+
+        # Apply the deltas
+        self.filter(homebuyer_id=homebuyer_id, house_id=house_id).update(
+            total=F("total") + total_delta, graded=F("graded") + graded_delta
+        )
+
+    # Method to apply weight changes of a homebuyer
+    def apply_weight_changes(self, homebuyer_id, changes):
+        # Get the default score and weight
+        default_score, default_weight = self._defaults()
+
+        # Get the weight deltas with None for missing weights
+        deltas = {
+            category_id: (
+                (default_weight if new_weight is None else new_weight)
+                - (default_weight if old_weight is None else old_weight)
+            )
+            for category_id, (old_weight, new_weight) in changes.items()
+        }
+        deltas = {category_id: delta for category_id, delta in deltas.items() if delta}
+
+        # If nothing changed, return
+        if not deltas:
+            return
+
+        # Get the weight delta for the category of each grade
+        grade_delta = Case(
+            *[
+                When(category_id=category_id, then=Value(delta))
+                for category_id, delta in deltas.items()
+            ],
+            default=Value(0),
+        )
+
+        # Get the weighted difference from the default score of the grades of each house
+        graded_delta = (
+            Grade.objects.filter(
+                house=OuterRef("house"),
+                homebuyer_id=homebuyer_id,
+                category_id__in=deltas,
+            )
+            .values("house")
+            .annotate(delta=Sum((F("score") - default_score) * grade_delta))
+            .values("delta")
+        )
+
+        # Apply the deltas in a single update
+        self.filter(homebuyer_id=homebuyer_id).update(
+            total=F("total")
+            + default_score * sum(deltas.values())
+            + Coalesce(Subquery(graded_delta), 0)
+        )
+
+    # Method to apply the default contribution of created or deleted categories
+    def apply_category_changes(self, couple_id, count):
+        # Get the default score and weight
+        default_score, default_weight = self._defaults()
+
+        # Apply the default contribution to the houses of the couple
+        self.filter(homebuyer__couple_id=couple_id).update(
+            total=F("total") + count * default_score * default_weight
+        )
+
+
+# Model for the weighted house score of a homebuyer
+class HouseScore(BaseModel):
+    # Add the fields to the model
+    total = models.IntegerField(default=0, verbose_name="Total")
+    graded = models.PositiveIntegerField(default=0, verbose_name="Graded")
+
+    # Create a foreign key to the house
+    house = models.ForeignKey(
+        "house.House", verbose_name="House", on_delete=models.CASCADE
+    )
+
+    # Create a foreign key to the homebuyer
+    homebuyer = models.ForeignKey(
+        "core.Homebuyer", verbose_name="Homebuyer", on_delete=models.CASCADE
+    )
+
+    # Initialize the house score manager object
+    objects = HouseScoreManager()
+
+    # String representation
+    def __str__(self):
+        return f"{self.homebuyer} scores {self.house} at {self.total}."
+
+    # Meta class
+    class Meta:
+        # Set the field ordering
+        ordering = ["house", "homebuyer"]
+
+        # Set the unique together constraint
+        unique_together = (("house", "homebuyer"),)
+
+        # Set the verbose names
+        verbose_name = "House Score"
+        verbose_name_plural = "House Scores"
+
+
+# Class to collect the backfill work of a transaction and run it once on commit
+class _BackfillBuffer(object):
+    # Constructor
+    def __init__(self, alias=None):
+        # Set the alias of the connection the buffer runs on commit of
+        self.alias = alias
+
+        # Set the couples and homebuyers to backfill
+        self.couple_ids = set()
+        self.homebuyer_ids = set()
+
+        # Set the created couples, homebuyers, houses and categories, and the moved homebuyers
+        self.created_couple_ids = set()
+        self.created_homebuyer_ids = set()
+        self.moved_homebuyer_ids = set()
+        self.created_house_ids = set()
+        self.created_category_counts = collections.Counter()
+
+    # Static method to get the buffers of the thread waiting to run, keyed on the connection alias
+    @staticmethod
+    def _pending():
+        # Create the buffers of the thread on first use
+        if not hasattr(_pending_backfills, "buffers"):
+            # Hold the buffers weakly, the on commit callbacks of the connection own them
+            _pending_backfills.buffers = weakref.WeakValueDictionary()
+
+        # Return the buffers
+        return _pending_backfills.buffers
+
+    # Class method to get the buffer of the current transaction
+    @classmethod
+    def current(cls):
+        # Get the database connection
+        connection = transaction.get_connection()
+
+        # If not in a transaction, return a buffer to run immediately
+        if not connection.in_atomic_block:
+            return cls()
+
+        # Get the buffer waiting for the transaction, gone once it ran or a rollback discarded it
+        buffer = cls._pending().get(connection.alias)
+
+        # If no buffer is waiting
+        if buffer is None:
+            # Create a new buffer that runs once when the transaction commits
+            buffer = cls(connection.alias)
+            cls._pending()[connection.alias] = buffer
+            transaction.on_commit(buffer, using=connection.alias, robust=False)
+
+        # Return the buffer
+        return buffer
+
+    # Property to check if the buffer runs on commit
+    @property
+    def deferred(self):
+        return self.alias is not None and self._pending().get(self.alias) is self
+
+    # Method to add a saved couple
+    def add_couple(self, couple, created):
+        self.couple_ids.add(couple.id)
+        if created:
+            self.created_couple_ids.add(couple.id)
+
+    # Method to add a saved homebuyer
+    def add_homebuyer(self, homebuyer, created):
+        self.homebuyer_ids.add(homebuyer.id)
+        if created:
+            self.created_homebuyer_ids.add(homebuyer.id)
+
+        # If the homebuyer moved to another couple, unknown for a deferred couple
+        elif getattr(homebuyer, "_loaded_couple_id", None) not in (
+            None,
+            homebuyer.couple_id,
+        ):
+            self.moved_homebuyer_ids.add(homebuyer.id)
+
+        # Store the saved couple id
+        homebuyer._loaded_couple_id = homebuyer.couple_id
+
+    # Method to add a saved house
+    def add_house(self, house, created):
+        self.couple_ids.add(house.couple_id)
+        if created:
+            self.created_house_ids.add(house.id)
+
+    # Method to add a saved category
+    def add_category(self, category, created):
+        self.couple_ids.add(category.couple_id)
+        if created:
+            self.created_category_counts[category.couple_id] += 1
+
+    # Method to run the backfill
+    def __call__(self):
+        # If the buffer was waiting for the transaction
+        if self.deferred:
+            # Clear it, so saves after the commit start a new buffer
+            del self._pending()[self.alias]
 
         # Create a database transaction
         with transaction.atomic():
-            # Bulk create the categories
-            created_categories = Category.objects.bulk_create(categories)
+            # Get the homebuyers of the saved couples and the saved homebuyers
+            homebuyers = list(
+                Homebuyer.objects.filter(
+                    models.Q(id__in=self.homebuyer_ids)
+                    | models.Q(couple_id__in=self.couple_ids)
+                )
+            )
+
+            # Set to store the homebuyers that got default grades
+            graded = set()
+
+            # Traverse the homebuyers
+            for homebuyer in homebuyers:
+                # Get the unweighted categories
+                unweighted_categories = homebuyer.unweighted_categories()
+
+                # If unweighted categories exist
+                if unweighted_categories:
+                    # Map the categories to category weights
+                    category_weights = map(
+                        lambda category: CategoryWeight(
+                            category=category, homebuyer=homebuyer
+                        ),
+                        unweighted_categories,
+                    )
+
+                    # Bulk create the category weights
+                    CategoryWeight.objects.bulk_create(category_weights)
+
+                # If missing grades are read as the default score
+                if settings.LAZY_GRADES:
+                    # Skip creating the default grades
+                    continue
+
+                # Map the ungraded house and category ids to grades
+                grades = (
+                    Grade(
+                        house_id=house_id, category_id=category_id, homebuyer=homebuyer
+                    )
+                    for house_id, category_id in homebuyer.ungraded_house_categories()
+                )
+
+                # Get the first batch of grades
+                batch = list(itertools.islice(grades, _GRADE_BATCH_SIZE))
 
-            # Get the homebuyers
-            homebuyers = couple.homebuyer_set.all()
+                # Stream the grades into the database in batches
+                while batch:
+                    # Bulk create the grades
+                    Grade.objects.bulk_create(batch)
 
-            # Create category weights
-            category_weights = [
-                CategoryWeight(category=category, homebuyer=homebuyer)
-                for category in created_categories
+                    # Add the homebuyer to the graded homebuyers
+                    graded.add(homebuyer.id)
+
+                    # Get the next batch of grades
+                    batch = list(itertools.islice(grades, _GRADE_BATCH_SIZE))
+
+            # Add the default contribution of the created categories to the house scores
+            for couple_id, count in self.created_category_counts.items():
+                HouseScore.objects.apply_category_changes(couple_id, count)
+
+            # Get the homebuyers whose house scores must be recomputed
+            refreshed = [
+                homebuyer
                 for homebuyer in homebuyers
+                if homebuyer.id in graded
+                or homebuyer.id in self.created_homebuyer_ids
+                or homebuyer.id in self.moved_homebuyer_ids
+                or homebuyer.couple_id in self.created_couple_ids
             ]
 
-            # Bulk create the category weights
-            CategoryWeight.objects.bulk_create(category_weights)
+            # If house scores must be recomputed
+            if refreshed:
+                # Refresh the house scores of all the houses
+                HouseScore.objects.refresh(refreshed)
+
+            # If houses were created
+            if self.created_house_ids:
+                # Refresh the house scores of the created houses
+                HouseScore.objects.refresh(
+                    [
+                        homebuyer
+                        for homebuyer in homebuyers
+                        if homebuyer not in refreshed
+                    ],
+                    house_ids=self.created_house_ids,
+                )
+
+            # If homebuyers were backfilled
+            if homebuyers:
+                # Bump the versions of their couples, their data changed after the save
+                Couple.objects.filter(
+                    id__in={homebuyer.couple_id for homebuyer in homebuyers}
+                ).bump_version()
+
+        # Return
+        return
+
+
+# Create a post save receiver to add default categories
+@receiver(models.signals.post_save, sender=Couple)
+def _add_default_categories(sender, instance, created, **kwargs):
+    # If a new couple is created
+    if created:
+        # Bulk create the categories, their weights are added by the backfill
+        Category.objects.bulk_create(
+            [
+                Category(couple_id=instance.id, **category_data)
+                for category_data in _DEFAULT_CATEGORIES
+            ]
+        )
 
     # Return
     return
 
 
+# Registry of the senders that need default grades and weights, mapped to their buffer method
+_BACKFILL_SENDERS = {
+    Couple: _BackfillBuffer.add_couple,
+    Homebuyer: _BackfillBuffer.add_homebuyer,
+    House: _BackfillBuffer.add_house,
+    Category: _BackfillBuffer.add_category,
+}
+
+
 # Create a post save receiver to add default grades and weights
-@receiver(models.signals.post_save)
 def _add_default_weights_and_grades(sender, instance, created, **kwargs):
-    # List to store the homebuyers
-    homebuyers = []
+    # Get the backfill buffer of the current transaction
+    buffer = _BackfillBuffer.current()
 
-    # If a new homebuyer is created
-    if sender == Homebuyer:
-        # Update the homebuyers list
-        homebuyers = [instance]
+    # Add the saved instance to the buffer
+    _BACKFILL_SENDERS[sender](buffer, instance, created)
 
-    # If a new house or category is created
-    elif sender in [Category, House]:
-        # Get the homebuyers
-        homebuyers = instance.couple.homebuyer_set.all()
-
-    # Create a database transaction
-    with transaction.atomic():
-        # Traverse the homebuyers
-        for homebuyer in homebuyers:
-            # Get the unweighted categories
-            unweighted_categories = homebuyer.unweighted_categories()
-
-            # If unweighted categories exist
-            if unweighted_categories:
-                # Map the categories to category weights
-                category_weights = map(
-                    lambda category: CategoryWeight(
-                        category=category, homebuyer=homebuyer
-                    ),
-                    unweighted_categories,
-                )
+    # If not in a transaction
+    if not buffer.deferred:
+        # Run the backfill immediately
+        buffer()
 
-                # Bulk create the category weights
-                CategoryWeight.objects.bulk_create(category_weights)
+    # Return
+    return
 
-            # Get the unevaluated houses
-            ungraded_house_categories = homebuyer.ungraded_house_categories()
 
-            # If unevaluated houses exist
-            if ungraded_house_categories:
-                # Function to map the house categories to grades
-                def _grade_mapper(house_category):
-                    house, category = house_category
-                    return Grade(house=house, category=category, homebuyer=homebuyer)
+# Connect the post save receiver to the senders in the registry only
+for _sender in _BACKFILL_SENDERS:
+    models.signals.post_save.connect(_add_default_weights_and_grades, sender=_sender)
 
-                # Map the ungraded house categories to grades
-                grades = map(_grade_mapper, ungraded_house_categories)
 
-                # Bulk create the grades
-                Grade.objects.bulk_create(grades)
+# Create a post save receiver to update the house scores for a grade
+@receiver(models.signals.post_save, sender=Grade)
+def _update_house_score_for_grade(sender, instance, created, **kwargs):
+    # If the grade is new
+    if created:
+        # Add the score to the house score
+        HouseScore.objects.apply_grade_changes(
+            instance.homebuyer_id,
+            instance.house_id,
+            {instance.category_id: (None, int(instance.score))},
+        )
+
+    # If the previous score is known
+    elif hasattr(instance, "_loaded_score"):
+        # Apply the score difference to the house score
+        HouseScore.objects.apply_grade_changes(
+            instance.homebuyer_id,
+            instance.house_id,
+            {instance.category_id: (instance._loaded_score, int(instance.score))},
+        )
+
+    # Else recompute the house score
+    else:
+        HouseScore.objects.refresh([instance.homebuyer], house_ids=[instance.house_id])
+
+    # Store the saved score
+    instance._loaded_score = int(instance.score)
+
     # Return
     return
+
+
+# Create a post save receiver to update the house scores for a category weight
+@receiver(models.signals.post_save, sender=CategoryWeight)
+def _update_house_scores_for_weight(sender, instance, created, **kwargs):
+    # If the weight is new
+    if created:
+        # Add the weight to the house scores
+        HouseScore.objects.apply_weight_changes(
+            instance.homebuyer_id, {instance.category_id: (None, int(instance.weight))}
+        )
+
+    # If the previous weight is known
+    elif hasattr(instance, "_loaded_weight"):
+        # Apply the weight difference to the house scores
+        HouseScore.objects.apply_weight_changes(
+            instance.homebuyer_id,
+            {instance.category_id: (instance._loaded_weight, int(instance.weight))},
+        )
+
+    # Else recompute the house scores
+    else:
+        HouseScore.objects.refresh([instance.homebuyer])
+
+    # Store the saved weight
+    instance._loaded_weight = int(instance.weight)
+
+    # Return
+    return
+
+
+# Function to get the model whose delete started a cascade
+def _origin_model(origin):
+    return origin.model if isinstance(origin, models.QuerySet) else type(origin)
+
+
+# Create a post delete receiver to update the house scores for a category
+@receiver(models.signals.post_delete, sender=Category)
+def _remove_house_scores_for_category(sender, instance, origin=None, **kwargs):
+    # If the category was not deleted on its own, the house scores are deleted with the couple
+    if _origin_model(origin) is not Category:
+        # Return
+        return
+
+    # Recompute the house scores of the couple once, its weights and grades are already deleted
+    HouseScore.objects.refresh(Homebuyer.objects.filter(couple_id=instance.couple_id))
+
+    # Return
+    return
+
+
+# Registry of the senders that change the couple data, mapped to their couple lookup and field
+_VERSIONED_SENDERS = {
+    Category: ("id", "couple_id"),
+    CategoryComparison: ("homebuyer", "homebuyer_id"),
+    CategoryWeight: ("homebuyer", "homebuyer_id"),
+    Grade: ("homebuyer", "homebuyer_id"),
+    Homebuyer: ("id", "couple_id"),
+    House: ("id", "couple_id"),
+}
+
+
+# Models whose deletes cascade to the couple data, the grades, weights and comparisons are fast deleted with them
+_VERSIONED_PARENTS = {Couple, Category, Homebuyer, House}
+
+
+# Create a post save receiver to bump the version of the couple
+def _bump_couple_version(sender, instance, **kwargs):
+    # Get the couple lookup and field of the sender
+    lookup, field = _VERSIONED_SENDERS[sender]
+
+    # Bump the version of the couple of the instance
+    Couple.objects.filter(**{lookup: getattr(instance, field)}).bump_version()
+
+    # Return
+    return
+
+
+# Create a post delete receiver to bump the version of the couple once per deleted parent
+def _bump_couple_version_on_delete(sender, instance, origin=None, **kwargs):
+    # If the delete cascaded from the deleted couple, or from another parent that bumps the version itself
+    if _origin_model(origin) in _VERSIONED_PARENTS - {sender}:
+        # Return
+        return
+
+    # Bump the version of the couple of the instance
+    _bump_couple_version(sender, instance)
+
+    # Return
+    return
+
+
+# Connect the version receivers to the senders in the registry only, the children bump on their own delete
+for _sender in _VERSIONED_SENDERS:
+    models.signals.post_save.connect(_bump_couple_version, sender=_sender)
+    if _sender in _VERSIONED_PARENTS:
+        models.signals.post_delete.connect(
+            _bump_couple_version_on_delete, sender=_sender
+        )
@@ -0,0 +1,124 @@
+# Import numpy
+import numpy as np
+
+
+# App imports
+from .models import CategoryComparison
+
+
+# Random consistency indices of the comparison matrices by size, from Saaty
+_RANDOM_INDEX = np.array(
+    [
+        0,
+        0,
+        0,
+        0.58,
+        0.9,
+        1.12,
+        1.24,
+        1.32,
+        1.41,
+        1.45,
+        1.49,
+        1.51,
+        1.48,
+        1.56,
+        1.57,
+        1.59,
+    ]
+)
+
+
+# Consistency ratio above which the comparisons should be revised
+CONSISTENCY_THRESHOLD = 0.1
+
+
+# Function to build the reciprocal comparison matrices of the homebuyers
+def comparison_matrices(homebuyers, categories):
+    # Get the index maps of the homebuyers and the categories
+    homebuyer_index = {
+        homebuyer.id: index for index, homebuyer in enumerate(homebuyers)
+    }
+    category_index = {category.id: index for index, category in enumerate(categories)}
+
+    # Create the matrices with every category as important as every other
+    matrices = np.ones((len(homebuyers), len(categories), len(categories)))
+
+    # Get the comparisons of the homebuyers in a single query
+    rows = CategoryComparison.objects.filter(homebuyer__in=homebuyers).values_list(
+        "homebuyer_id", "category_id", "other_id", "value"
+    )
+
+    # Keep the comparisons between the given categories as matrix indices
+    comparisons = [
+        (
+            homebuyer_index[homebuyer_id],
+            category_index[category],
+            category_index[other],
+            value,
+        )
+        for homebuyer_id, category, other, value in rows
+        if category in category_index and other in category_index
+    ]
+
+    # If there are comparisons
+    if comparisons:
+        # Split the comparisons into index columns and a value column
+        homebuyer, category, other, value = zip(*comparisons)
+        homebuyer, category, other = (
+            np.array(column, dtype=np.intp) for column in (homebuyer, category, other)
+        )
+        value = np.array(value, dtype=np.float64)
+
+        # Scatter the values and their reciprocals into the matrices
+        matrices[homebuyer, category, other] = value
+        matrices[homebuyer, other, category] = 1 / value
+
+    # Return the matrices
+    return matrices
+
+
+# Function to get the principal eigenvectors and eigenvalues of the stacked matrices
+def principal_eigenvectors(matrices):
+    # Get the eigenvalues and eigenvectors of all the matrices at once
+    values, vectors = np.linalg.eig(matrices)
+
+    # Get the index of the largest real eigenvalue of each matrix
+    stack = np.arange(matrices.shape[0])
+    principal = values.real.argmax(axis=1)
+
+    # Get the principal eigenvectors, normalized to sum to one
+    weights = np.abs(vectors[stack, :, principal].real)
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    # Return the weights and the principal eigenvalues
+    return weights, values.real[stack, principal]
+
+
+# Function to get the consistency ratios of the comparison matrices
+def consistency_ratios(eigenvalues, size):
+    # Matrices of up to two categories are always consistent
+    if size < 3:
+        return np.zeros_like(eigenvalues)
+
+    # Get the consistency index and the random index of the size
+    consistency_index = (eigenvalues - size) / (size - 1)
+    random_index = _RANDOM_INDEX[min(size, len(_RANDOM_INDEX) - 1)]
+
+    # Return the consistency ratios
+    return np.maximum(consistency_index / random_index, 0)
+
+
+# Function to derive the category weights of the homebuyers from their comparisons
+def pairwise_weights(homebuyers, categories):
+    # If there is nothing to compare
+    if not homebuyers or not categories:
+        return np.zeros((len(categories), len(homebuyers))), np.zeros(len(homebuyers))
+
+    # Solve the comparison matrices of all the homebuyers together
+    weights, eigenvalues = principal_eigenvectors(
+        comparison_matrices(homebuyers, categories)
+    )
+
+    # Return the categories x homebuyers weights and the consistency ratios
+    return weights.T, consistency_ratios(eigenvalues, len(categories))
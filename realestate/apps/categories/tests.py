@@ -0,0 +1,118 @@
+# Django imports
+from django.test import TestCase
+from django.urls import reverse
+
+
+# App imports
+from realestate.apps.categories.models import Category
+from realestate.apps.categories.models import CategoryWeight
+from realestate.apps.categories.models import Grade
+from realestate.apps.categories.models import HouseScore
+from realestate.apps.core.testing import create_homebuyer
+
+
+# Test case for the category list page
+class CategoryListViewTestCase(TestCase):
+    # Set the number of queries of the page, whatever the number of categories
+    _QUERY_COUNT = 4
+
+    # Class method to create the homebuyers of the tests
+    @classmethod
+    def setUpTestData(cls):
+        # Run the backfill of the default weights inside the test transaction
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.small_homebuyer = create_homebuyer("small", categories=5)
+            cls.large_homebuyer = create_homebuyer("large", categories=50)
+
+    # Protected method to get the category list of a homebuyer in the fixed number of queries
+    def _assert_list_queries(self, homebuyer):
+        # Log the homebuyer in
+        self.client.force_login(homebuyer.user)
+
+        # Get the category list page
+        with self.assertNumQueries(self._QUERY_COUNT):
+            response = self.client.get(reverse("category-list"))
+
+        # Check the page lists every category
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(response.context["weighted"]), homebuyer.couple.category_set.count()
+        )
+
+    # Test the page of a homebuyer with a few categories
+    def test_small_query_count(self):
+        self._assert_list_queries(self.small_homebuyer)
+
+    # Test the page of a homebuyer with many categories
+    def test_large_query_count(self):
+        self._assert_list_queries(self.large_homebuyer)
+
+    # Test the posted weights are saved and applied to the house scores
+    def test_post_weights(self):
+        # Log the homebuyer in
+        self.client.force_login(self.large_homebuyer.user)
+
+        # Weigh every category as very important
+        data = {
+            str(category_id): 5
+            for category_id in Category.objects.filter(
+                couple=self.large_homebuyer.couple
+            ).values_list("id", flat=True)
+        }
+
+        # Post the weights
+        response = self.client.post(reverse("category-list"), data)
+
+        # Check every weight is saved
+        self.assertRedirects(
+            response, reverse("category-list"), fetch_redirect_response=False
+        )
+        self.assertEqual(
+            CategoryWeight.objects.filter(
+                homebuyer=self.large_homebuyer, weight=5
+            ).count(),
+            len(data),
+        )
+
+
+# Test case for the house scores kept up to date by the bulk writes of the querysets
+class HouseScoreQuerySetTestCase(TestCase):
+    # Class method to create the homebuyer of the tests
+    @classmethod
+    def setUpTestData(cls):
+        # Run the backfill of the default weights and grades inside the test transaction
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.homebuyer = create_homebuyer("homebuyer", houses=3)
+
+    # Method to check the stored house scores match the grades and weights
+    def assertHouseScoresMatch(self):
+        # Get the stored house scores
+        stored = {
+            (house_id, homebuyer_id): (total, graded)
+            for house_id, homebuyer_id, total, graded in HouseScore.objects.values_list(
+                "house_id", "homebuyer_id", "total", "graded"
+            )
+        }
+
+        # Check they match the expected house scores
+        self.assertEqual(stored, HouseScore.objects.expected([self.homebuyer]))
+
+    # Test the grade updates and deletes of a queryset
+    def test_grade_queryset(self):
+        # Update the scores of the grades
+        Grade.objects.filter(homebuyer=self.homebuyer).update(score=5)
+        self.assertHouseScoresMatch()
+
+        # Delete the grades
+        Grade.objects.filter(homebuyer=self.homebuyer).delete()
+        self.assertHouseScoresMatch()
+
+    # Test the weight updates and deletes of a queryset
+    def test_weight_queryset(self):
+        # Update the weights
+        CategoryWeight.objects.filter(homebuyer=self.homebuyer).update(weight=1)
+        self.assertHouseScoresMatch()
+
+        # Delete the weights
+        CategoryWeight.objects.filter(homebuyer=self.homebuyer).delete()
+        self.assertHouseScoresMatch()
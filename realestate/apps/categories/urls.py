@@ -4,6 +4,7 @@ from django.urls import path
 
 # Import views for the urls
 from .views import CategoryAddView
+from .views import CategoryCompareView
 from .views import CategoryDeleteView
 from .views import CategoryEditView
 from .views import CategoryListView
@@ -13,6 +14,7 @@ from .views import CategoryListView
 urlpatterns = [
     path("", CategoryListView.as_view(), name="category-list"),
     path("add/", CategoryAddView.as_view(), name="category-add"),
+    path("compare/", CategoryCompareView.as_view(), name="category-compare"),
     path("edit/<str:category_id>/", CategoryEditView.as_view(), name="category-edit"),
     path(
         "delete/<str:category_id>/",
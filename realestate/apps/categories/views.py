@@ -1,21 +1,28 @@
-# Import json
+# Import itertools and json
+import itertools
 import json
 
 
 # Django imports
 from django.conf import settings
 from django.contrib import messages
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
 
 
 # App imports
+from .forms import CategoryComparisonForm
 from .forms import CategoryDeleteForm
 from .forms import CategoryEditForm
 from .forms import CategoryWeightEditForm
 from .models import Category
+from .models import CategoryComparison
 from .models import CategoryWeight
+from .models import HouseScore
+from .pairwise import CONSISTENCY_THRESHOLD
+from .pairwise import pairwise_weights
 from realestate.apps.appauth.models import User
 from realestate.apps.core.models import Couple
 from realestate.apps.core.models import Homebuyer
@@ -66,24 +73,27 @@ class CategoryListView(BaseView):
     # Method to handle the get request
     def get(self, request, *args, **kwargs):
         # Get the homebuyer and couple
-        homebuyer = Homebuyer.objects.get(user=request.user)
+        homebuyer = request.role
         couple = homebuyer.couple
 
-        # Get the categories and weights
-        categories = Category.objects.filter(couple=couple)
-        weights = CategoryWeight.objects.filter(homebuyer=homebuyer)
+        # Get the categories
+        categories = list(Category.objects.filter(couple=couple))
+
+        # Get the weights of the homebuyer keyed by category id
+        weights = dict(
+            CategoryWeight.objects.filter(homebuyer=homebuyer)
+            .order_by()
+            .values_list("category_id", "weight")
+        )
+
+        # Get the default weight for the missing weights
+        default_weight = CategoryWeight._meta.get_field("weight").default
 
         # Map the categories to the weights
-        weighted = {}
-        for category in categories:
-            missing = True
-            for weight in weights:
-                if weight.category.id == category.id:
-                    weighted[category] = weight.weight
-                    missing = False
-                    break
-            if missing:
-                weighted[category] = 3
+        weighted = {
+            str(category.id): weights.get(category.id, default_weight)
+            for category in categories
+        }
 
         # Populate the form
         form = self.form_class(extra_fields=weighted, categories=categories)
@@ -113,40 +123,224 @@ class CategoryListView(BaseView):
     # Method to handle the post request
     def post(self, request, *args, **kwargs):
         # Get the homebuyer and couple
-        homebuyer = Homebuyer.objects.get(user=request.user)
+        homebuyer = request.role
         couple = homebuyer.couple
 
         # Get the categories
         categories = Category.objects.filter(couple=couple)
 
-        # Traverse the categories
-        for category in categories:
-            # Get the id and weight
-            id = category.id
-            weight = request.POST.get(str(category), 3)
+        # Get the default weight for the categories that are not submitted
+        default_weight = CategoryWeight._meta.get_field("weight").default
 
-            # Get the category for the id
-            category = Category.objects.get(id=id)
+        # Get the submitted weights for the categories
+        weights = {
+            category.id: int(request.POST.get(str(category.id), default_weight))
+            for category in categories
+        }
 
-            # Get or create the category weight
-            category_weight, created = CategoryWeight.objects.get_or_create(
-                homebuyer=homebuyer,
-                category=category,
+        # Create a database transaction
+        with transaction.atomic():
+            # Lock the homebuyer, so concurrent weight posts apply their changes in turn
+            list(
+                Homebuyer.objects.select_for_update()
+                .filter(id=homebuyer.id)
+                .order_by()
+                .values_list("id")
             )
 
-            # Update the weight
-            category_weight.weight = weight
+            # Get the saved weights of the homebuyer
+            saved_weights = dict(
+                CategoryWeight.objects.select_for_update()
+                .filter(homebuyer=homebuyer)
+                .order_by()
+                .values_list("category_id", "weight")
+            )
+
+            # Get the weights that are new or changed
+            changes = {
+                category_id: (saved_weights.get(category_id), weight)
+                for category_id, weight in weights.items()
+                if saved_weights.get(category_id) != weight
+            }
+
+            # Upsert the changed weights in a single query
+            CategoryWeight.objects.bulk_create(
+                [
+                    CategoryWeight(
+                        homebuyer=homebuyer, category_id=category_id, weight=weight
+                    )
+                    for category_id, (_, weight) in changes.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["homebuyer", "category"],
+                update_fields=["weight"],
+            )
 
-            # Save the category weight
-            category_weight.save()
+            # Apply the changes to the house scores
+            HouseScore.objects.apply_weight_changes(homebuyer.id, changes)
 
-        # Add a success message
-        messages.success(request, "Your category weights have been saved!")
+            # If weights changed, bump the version of the couple
+            if changes:
+                Couple.objects.filter(id=homebuyer.couple_id).bump_version()
+
+        # Get the summaries of the changed categories
+        changed = [
+            category.summary for category in categories if category.id in changes
+        ]
+
+        # If weights changed
+        if changed:
+            # Add a success message with the changed categories
+            messages.success(
+                request,
+                f"Your category weights have been saved! Changed: {', '.join(changed)}.",
+            )
+
+        # Else add an info message
+        else:
+            messages.info(request, "None of your category weights changed.")
 
         # Redirect to the categories page
         return redirect("category-list")
 
 
+# Class based view to compare the categories pairwise
+class CategoryCompareView(BaseView):
+    # Get the allowed user types
+    _USER_TYPES_ALLOWED = User._HOMEBUYER_ONLY
+
+    # Set the template name
+    template_name = "categories/compare_category.html"
+
+    # Set the form class
+    form_class = CategoryComparisonForm
+
+    # Method to get the compared category pairs with their saved values
+    def _pairs(self, homebuyer, categories):
+        # Get the saved values of the homebuyer keyed by category pair
+        values = {
+            (category_id, other_id): value
+            for category_id, other_id, value in CategoryComparison.objects.filter(
+                homebuyer=homebuyer
+            ).values_list("category_id", "other_id", "value")
+        }
+
+        # List to store the pairs
+        pairs = []
+
+        # Traverse the pairs of categories
+        for category, other in itertools.combinations(categories, 2):
+            # Order the pair by the category ids, as the comparisons are saved
+            if str(other.id) < str(category.id):
+                category, other = other, category
+
+            # Update the pairs with the saved value, equally important by default
+            pairs.append((category, other, values.get((category.id, other.id), 1)))
+
+        # Return the pairs
+        return pairs
+
+    # Method to get the context
+    def _context(self, homebuyer, categories, form):
+        # Derive the weights and the consistency ratio from the saved comparisons
+        weights, ratios = pairwise_weights([homebuyer], categories)
+
+        # Return the context
+        return {
+            "couple": homebuyer.couple,
+            "form": form,
+            "derived_weights": [
+                (category, 100 * weight)
+                for category, weight in zip(categories, weights[:, 0])
+            ],
+            "consistency_ratio": float(ratios[0]),
+            "consistency_threshold": CONSISTENCY_THRESHOLD,
+        }
+
+    # Method to handle the get request
+    def get(self, request, *args, **kwargs):
+        # Get the homebuyer and categories
+        homebuyer = request.role
+        categories = list(Category.objects.filter(couple_id=homebuyer.couple_id))
+
+        # Populate the form
+        form = self.form_class(
+            initial={"weighting_mode": homebuyer.weighting_mode},
+            pairs=self._pairs(homebuyer, categories),
+        )
+
+        # Render the template
+        return render(
+            request, self.template_name, self._context(homebuyer, categories, form)
+        )
+
+    # Method to handle the post request
+    def post(self, request, *args, **kwargs):
+        # Get the homebuyer and categories
+        homebuyer = request.role
+        categories = list(Category.objects.filter(couple_id=homebuyer.couple_id))
+
+        # Populate the form
+        form = self.form_class(request.POST, pairs=self._pairs(homebuyer, categories))
+
+        # If the form is not valid
+        if not form.is_valid():
+            # Send an error message
+            messages.error(request, "Your comparisons could not be saved!")
+
+            # Render the template
+            return render(
+                request,
+                self.template_name,
+                self._context(homebuyer, categories, form),
+            )
+
+        # With a transaction
+        with transaction.atomic():
+            # Save the weighting mode
+            Homebuyer.objects.filter(id=homebuyer.id).update(
+                weighting_mode=form.cleaned_data["weighting_mode"]
+            )
+
+            # Save all the comparisons in a single upsert
+            CategoryComparison.objects.bulk_create(
+                [
+                    CategoryComparison(
+                        homebuyer=homebuyer,
+                        category_id=category_id,
+                        other_id=other_id,
+                        value=value,
+                    )
+                    for (category_id, other_id), value in form.comparisons().items()
+                ],
+                update_conflicts=True,
+                unique_fields=["homebuyer", "category", "other"],
+                update_fields=["value"],
+            )
+
+            # Bump the version of the couple
+            Couple.objects.filter(id=homebuyer.couple_id).bump_version()
+
+        # Get the consistency ratio of the saved comparisons
+        _, ratios = pairwise_weights([homebuyer], categories)
+
+        # If the comparisons are consistent enough
+        if ratios[0] <= CONSISTENCY_THRESHOLD:
+            # Send a success message
+            messages.success(request, "Your comparisons have been saved!")
+
+        # Otherwise
+        else:
+            # Send a warning message
+            messages.warning(
+                request,
+                f"Your comparisons have been saved, but they are inconsistent (consistency ratio {ratios[0]:.2f}). Please revise them.",
+            )
+
+        # Redirect to the compare page
+        return redirect("category-compare")
+
+
 # Class based view to add a category
 class CategoryAddView(BaseView):
     # Set the template name
@@ -170,11 +364,11 @@ class CategoryAddView(BaseView):
 
         # If the summary and description are not None
         if summary and description:
-            # Get the couple
-            couple = Couple.objects.filter(homebuyer__user=request.user).first()
+            # Get the couple id of the homebuyer from the request
+            couple_id = request.couple_id
 
             # Check if the category already exists
-            if Category.objects.filter(summary=summary, couple=couple).exists():
+            if Category.objects.filter(summary=summary, couple_id=couple_id).exists():
                 # Send an error message
                 messages.error(request, f"Category '{summary}' already exists!")
 
@@ -187,7 +381,7 @@ class CategoryAddView(BaseView):
                 category = Category.objects.create(
                     summary=summary,
                     description=description,
-                    couple=couple,
+                    couple_id=couple_id,
                 )
 
             except:
@@ -226,25 +420,25 @@ class CategoryEditView(BaseView):
         # If the category id is not None
         if category_id:
             # Get the category
-            category = get_object_or_404(Category.objects.filter(id=category_id))
-
-            # If the category is in the couple
-            if category.couple.homebuyer_set.filter(user=request.user).exists():
-                # Populate the form
-                form = self.form_class(
-                    initial={
-                        "id": category.id,
-                        "summary": category.summary,
-                        "description": category.description,
-                    }
-                )
+            category = get_object_or_404(
+                Category.objects.for_user(request.user), id=category_id
+            )
 
-                # Render the template
-                return render(
-                    request,
-                    self.template_name,
-                    {"form": form, "category": category},
-                )
+            # Populate the form
+            form = self.form_class(
+                initial={
+                    "id": category.id,
+                    "summary": category.summary,
+                    "description": category.description,
+                }
+            )
+
+            # Render the template
+            return render(
+                request,
+                self.template_name,
+                {"form": form, "category": category},
+            )
 
         # Redirect to the categories page
         return redirect("category-list")
@@ -257,49 +451,53 @@ class CategoryEditView(BaseView):
         # If the category id is not None
         if category_id:
             # Get the category
-            category = get_object_or_404(Category.objects.filter(id=category_id))
-
-            # If the category is in the couple
-            if category.couple.homebuyer_set.filter(user=request.user).exists():
-                # Populate the form
-                form = self.form_class(request.POST)
-
-                # If the form is valid
-                if form.is_valid():
-                    # Get the data from the form
-                    category.summary = form.cleaned_data["summary"]
-                    category.description = form.cleaned_data["description"]
+            category = get_object_or_404(
+                Category.objects.for_user(request.user), id=category_id
+            )
 
-                    # Check if the category already exists
-                    if Category.objects.filter(
-                        summary=category.summary, couple=category.couple
-                    ).exists():
-                        # Send an error message
-                        messages.error(
-                            request, f"Category '{category.summary}' already exists!"
-                        )
+            # Populate the form
+            form = self.form_class(request.POST)
+
+            # If the form is valid
+            if form.is_valid():
+                # Get the data from the form
+                category.summary = form.cleaned_data["summary"]
+                category.description = form.cleaned_data["description"]
+
+                # Check if the category already exists
+                if (
+                    Category.objects.filter(
+                        summary=category.summary, couple_id=category.couple_id
+                    )
+                    .exclude(id=category.id)
+                    .exists()
+                ):
+                    # Send an error message
+                    messages.error(
+                        request, f"Category '{category.summary}' already exists!"
+                    )
 
-                        # Redirect to the categories page
-                        return redirect("category-edit", category_id=category.id)
+                    # Redirect to the categories page
+                    return redirect("category-edit", category_id=category.id)
 
-                    # Save the category
-                    category.save()
+                # Save the category
+                category.save()
 
-                    # Send a success message
-                    messages.success(request, "Your category has been updated!")
+                # Send a success message
+                messages.success(request, "Your category has been updated!")
 
-                    # Redirect to the categories page
-                    return redirect("category-list")
+                # Redirect to the categories page
+                return redirect("category-list")
 
-                # Send an error message
-                messages.error(request, "Your category could not be updated!")
+            # Send an error message
+            messages.error(request, "Your category could not be updated!")
 
-                # Render the template
-                return render(
-                    request,
-                    self.template_name,
-                    {"form": form, "category": category},
-                )
+            # Render the template
+            return render(
+                request,
+                self.template_name,
+                {"form": form, "category": category},
+            )
 
         # Redirect to the categories page
         return redirect("category-list")
@@ -321,23 +519,23 @@ class CategoryDeleteView(BaseView):
         # If the category id is not None
         if category_id:
             # Get the category
-            category = get_object_or_404(Category.objects.filter(id=category_id))
-
-            # If the category is in the couple
-            if category.couple.homebuyer_set.filter(user=request.user).exists():
-                # Populate the form
-                form = self.form_class(
-                    initial={
-                        "id": category.id,
-                        "summary": category.summary,
-                        "description": category.description,
-                    }
-                )
+            category = get_object_or_404(
+                Category.objects.for_user(request.user), id=category_id
+            )
 
-                # Render the template
-                return render(
-                    request, self.template_name, {"category": category, "form": form}
-                )
+            # Populate the form
+            form = self.form_class(
+                initial={
+                    "id": category.id,
+                    "summary": category.summary,
+                    "description": category.description,
+                }
+            )
+
+            # Render the template
+            return render(
+                request, self.template_name, {"category": category, "form": form}
+            )
 
         # Render the template
         return render(request, self.template_name, {})
@@ -350,18 +548,18 @@ class CategoryDeleteView(BaseView):
         # If the category id is not None
         if category_id:
             # Get the category
-            category = get_object_or_404(Category.objects.filter(id=category_id))
+            category = get_object_or_404(
+                Category.objects.for_user(request.user), id=category_id
+            )
 
-            # If the category is in the couple
-            if category.couple.homebuyer_set.filter(user=request.user).exists():
-                # Delete the category
-                category.delete()
+            # Delete the category
+            category.delete()
 
-                # Send a success message
-                messages.success(request, "Your category has been deleted!")
+            # Send a success message
+            messages.success(request, "Your category has been deleted!")
 
-                # Redirect to the categories page
-                return redirect("category-list")
+            # Redirect to the categories page
+            return redirect("category-list")
 
         # Send an error message
         messages.error(request, "Your category could not be deleted!")
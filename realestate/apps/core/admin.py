@@ -78,7 +78,7 @@ class HomebuyerAdmin(BaseAdmin):
     readonly_fields = ("id",)
 
     # Set the fields to be displayed in the admin panel
-    fields = ("id", "user", "couple")
+    fields = ("id", "user", "couple", "weighting_mode")
 
     # Set the inlines
     inlines = [CategoryWeightInline]
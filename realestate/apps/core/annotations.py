@@ -0,0 +1,75 @@
+# Django imports
+from django.db.models import F
+from django.db.models import Func
+from django.db.models import IntegerField
+from django.db.models import OuterRef
+from django.db.models import Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Greatest
+from django.db.models.functions import NullIf
+
+
+# App imports
+from realestate.apps.categories.models import Category
+from realestate.apps.categories.models import Grade
+from realestate.apps.core.models import Homebuyer
+from realestate.apps.house.models import House
+
+
+# Function to count the rows of a queryset inside a subquery
+def count(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .annotate(
+                count=Func(F("id"), function="COUNT", output_field=IntegerField())
+            )
+            .values("count")
+        ),
+        0,
+    )
+
+
+# Function to count the houses times the categories a homebuyer of a couple can grade
+def gradable():
+    return count(House.objects.filter(couple=OuterRef("pk"))) * count(
+        Category.objects.filter(couple=OuterRef("pk"))
+    )
+
+
+# Function to get the evaluation progress of a couple in percent
+def progress():
+    # Count the evaluated grades and the cells that can be graded
+    graded = count(Grade.objects.evaluated().filter(homebuyer__couple=OuterRef("pk")))
+    cells = gradable() * count(Homebuyer.objects.filter(couple=OuterRef("pk")))
+
+    # Return the graded percentage, zero when there is nothing to grade
+    return Coalesce(graded * 100 / NullIf(cells, 0), 0)
+
+
+# Function to get the latest value of a date time field of a queryset inside a subquery
+def latest(queryset, field):
+    return Subquery(
+        queryset.filter(**{f"{field}__isnull": False})
+        .order_by(f"-{field}")
+        .values(field)[:1]
+    )
+
+
+# Function to get the time of the last evaluation, house or category of a couple
+def last_activity():
+    return Greatest(
+        F("created"),
+        Coalesce(
+            latest(Grade.objects.filter(homebuyer__couple=OuterRef("pk")), "evaluated"),
+            F("created"),
+        ),
+        Coalesce(
+            latest(House.objects.filter(couple=OuterRef("pk")), "created"),
+            F("created"),
+        ),
+        Coalesce(
+            latest(Category.objects.filter(couple=OuterRef("pk")), "created"),
+            F("created"),
+        ),
+    )
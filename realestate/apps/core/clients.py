@@ -0,0 +1,276 @@
+# Import base64 and json
+import base64
+import json
+
+
+# Django imports
+from django.core.exceptions import ValidationError
+from django.db.models import Exists
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import Prefetch
+from django.db.models import Q
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+from django.db.models.functions import Concat
+from django.db.models.functions import Lower
+
+
+# App imports
+from .annotations import count
+from .annotations import gradable
+from .annotations import progress
+from realestate.apps.categories.models import Grade
+from realestate.apps.core.models import Couple
+from realestate.apps.core.models import Homebuyer
+from realestate.apps.pending.models import PendingCouple
+from realestate.apps.pending.models import PendingHomebuyer
+
+
+# Function to get the sortable name of the first member of a couple
+def _name(queryset):
+    return Coalesce(
+        Subquery(
+            queryset.annotate(
+                client_name=Lower(Concat(F("last_name"), Value(" "), F("first_name")))
+            )
+            .order_by("client_name")
+            .values("client_name")[:1]
+        ),
+        Value(""),
+    )
+
+
+# Class to list the clients of a realtor one page at a time
+class ClientList(object):
+    # Set the number of clients per page
+    page_size = 25
+
+    # Set the sort keys of each sort option
+    sorts = {
+        "created": ("created",),
+        "name": ("name", "created"),
+        "registration": ("registration", "created"),
+        "progress": ("progress", "created"),
+    }
+
+    # Set the default sort
+    default_sort = "-created"
+
+    # Set the kinds of clients
+    _COUPLE = 0
+    _PENDING_COUPLE = 1
+
+    # Constructor
+    def __init__(self, realtor, sort=None, cursor=None):
+        # Set the realtor
+        self.realtor = realtor
+
+        # Set the sort, falling back to the default sort
+        if not sort or sort.lstrip("-") not in self.sorts:
+            sort = self.default_sort
+        self.sort = sort
+
+        # Set the direction and the key fields, with the kind and id as tie breakers
+        self.descending = sort.startswith("-")
+        self.fields = self.sorts[sort.lstrip("-")] + ("kind", "id")
+
+        # Get the key rows of the page and the cursor of the next page
+        self.rows, self.next_cursor = self._page(self._decode(cursor))
+
+    # Protected method to get the key expressions of the couples
+    def _couple_keys(self):
+        return {
+            "name": _name(
+                Homebuyer.objects.filter(couple=OuterRef("pk")).annotate(
+                    last_name=F("user__last_name"), first_name=F("user__first_name")
+                )
+            ),
+            "registration": count(Homebuyer.objects.filter(couple=OuterRef("pk"))),
+            "progress": progress(),
+            "kind": Value(self._COUPLE),
+        }
+
+    # Protected method to get the key expressions of the pending couples
+    def _pending_couple_keys(self):
+        # Get the pending homebuyers of the pending couple
+        pending_homebuyers = PendingHomebuyer.objects.filter(
+            pending_couple=OuterRef("pk")
+        )
+
+        # Return the key expressions
+        return {
+            "name": _name(pending_homebuyers),
+            "registration": count(
+                pending_homebuyers.filter(
+                    Exists(Homebuyer.objects.filter(user__email=OuterRef("email")))
+                )
+            ),
+            "progress": Value(0),
+            "kind": Value(self._PENDING_COUPLE),
+        }
+
+    # Protected method to get the key rows of a model
+    def _keys(self, model, expressions):
+        # Annotate the keys that are not model fields, in the order of the key fields
+        annotations = {
+            field: expressions[field] for field in self.fields if field in expressions
+        }
+
+        # Return the key rows of the realtor
+        return (
+            model.objects.filter(realtor=self.realtor)
+            .annotate(**annotations)
+            .order_by()
+            .values(*self.fields)
+        )
+
+    # Protected method to get the filter for the rows after the key
+    def _after(self, key):
+        # Get the lookup of the direction
+        lookup = "lt" if self.descending else "gt"
+
+        # Rows whose first differing key field comes after the key
+        after = Q()
+        for index, field in enumerate(self.fields):
+            after |= Q(
+                **dict(zip(self.fields[:index], key)),
+                **{f"{field}__{lookup}": key[index]},
+            )
+
+        # Return the filter
+        return after
+
+    # Protected method to get the key rows of the page
+    def _page(self, key):
+        # Get the key rows of the couples and the pending couples
+        querysets = [
+            self._keys(Couple, self._couple_keys()),
+            self._keys(PendingCouple, self._pending_couple_keys()),
+        ]
+
+        # If the key is set
+        if key is not None:
+            try:
+                # Keep only the rows after the key
+                querysets = [
+                    queryset.filter(self._after(key)) for queryset in querysets
+                ]
+
+            # Start from the first page if the key values are not valid
+            except (ValidationError, ValueError, TypeError):
+                pass
+
+        # Get the ordering of the key fields
+        ordering = [f"-{field}" if self.descending else field for field in self.fields]
+
+        # Get one more row than the page size to check for a next page
+        rows = list(
+            querysets[0]
+            .union(querysets[1], all=True)
+            .order_by(*ordering)[: self.page_size + 1]
+        )
+
+        # If there is no next page
+        if len(rows) <= self.page_size:
+            return rows, None
+
+        # Return the rows of the page and the cursor of its last row
+        rows = rows[: self.page_size]
+        return rows, self._encode([rows[-1][field] for field in self.fields])
+
+    # Protected method to encode a cursor
+    def _encode(self, key):
+        return base64.urlsafe_b64encode(
+            json.dumps({"sort": self.sort, "key": key}, default=str).encode()
+        ).decode()
+
+    # Protected method to decode a cursor
+    def _decode(self, cursor):
+        # If the cursor is not set
+        if not cursor:
+            return None
+
+        # Decode the cursor
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (TypeError, ValueError):
+            return None
+
+        # Return the key if it belongs to the sort of the list and holds only scalar values
+        if (
+            isinstance(data, dict)
+            and data.get("sort") == self.sort
+            and isinstance(data.get("key"), list)
+            and len(data["key"]) == len(self.fields)
+            and all(
+                isinstance(value, (str, int, float)) and not isinstance(value, bool)
+                for value in data["key"]
+            )
+        ):
+            return data["key"]
+
+        # Otherwise, return None
+        return None
+
+    # Property to get the couple, homebuyers and pending flag of the clients
+    @property
+    def couple_data(self):
+        # Get the ids of the couples and the pending couples of the page
+        couple_ids = [row["id"] for row in self.rows if row["kind"] == self._COUPLE]
+        pending_couple_ids = [
+            row["id"] for row in self.rows if row["kind"] == self._PENDING_COUPLE
+        ]
+
+        # Get the couples with their progress, homebuyers, users and evaluated grade counts
+        couples = (
+            Couple.objects.filter(id__in=couple_ids)
+            .annotate(progress=progress(), gradable=gradable())
+            .prefetch_related(
+                Prefetch(
+                    "homebuyer_set",
+                    queryset=Homebuyer.objects.select_related("user").annotate(
+                        evaluated_count=count(
+                            Grade.objects.evaluated().filter(homebuyer=OuterRef("pk"))
+                        )
+                    ),
+                )
+            )
+        )
+
+        # Get the pending couples with the registration status of their homebuyers
+        pending_couples = PendingCouple.objects.filter(
+            id__in=pending_couple_ids
+        ).prefetch_related(
+            Prefetch(
+                "pendinghomebuyer_set",
+                queryset=PendingHomebuyer.objects.annotate(
+                    is_registered=Exists(
+                        Homebuyer.objects.filter(user__email=OuterRef("email"))
+                    )
+                ),
+            )
+        )
+
+        # Map the kinds and ids to the client data
+        clients = {}
+        for couple in couples:
+            clients[self._COUPLE, couple.id] = (
+                couple,
+                couple.homebuyer_set.all(),
+                False,
+            )
+        for pending_couple in pending_couples:
+            clients[self._PENDING_COUPLE, pending_couple.id] = (
+                pending_couple,
+                pending_couple.pendinghomebuyer_set.all(),
+                True,
+            )
+
+        # Return the client data in the order of the page
+        return [
+            clients[row["kind"], row["id"]]
+            for row in self.rows
+            if (row["kind"], row["id"]) in clients
+        ]
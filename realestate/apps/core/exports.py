@@ -0,0 +1,146 @@
+# Import csv, itertools and json
+import csv
+import itertools
+import json
+
+
+# App imports
+from realestate.apps.categories.models import CategoryWeight
+from realestate.apps.categories.models import Grade
+
+
+# Class to write the csv lines to a string instead of a file
+class _Echo(object):
+    # Method to return the written line
+    def write(self, value):
+        return value
+
+
+# Function to encode the rows as csv lines, starting with the header
+def _csv_lines(columns, rows):
+    # Get the csv writer
+    writer = csv.writer(_Echo())
+
+    # Yield the header and the rows
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# Function to encode the rows as newline delimited json objects
+def _ndjson_lines(columns, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), default=str) + "\n"
+
+
+# Class to stream the evaluation data of couples one row at a time
+class CoupleExport(object):
+    # Set the number of rows fetched from the database at a time
+    chunk_size = 2000
+
+    # Set the columns of the rows
+    columns = (
+        "couple_id",
+        "house_id",
+        "house",
+        "address",
+        "category_id",
+        "category",
+        "homebuyer_id",
+        "homebuyer",
+        "weight",
+        "score",
+    )
+
+    # Set the content type, file extension and encoder of each format
+    formats = {
+        "csv": ("text/csv", "csv", _csv_lines),
+        "ndjson": ("application/x-ndjson", "ndjson", _ndjson_lines),
+    }
+
+    # Set the default format
+    default_format = "csv"
+
+    # Constructor
+    def __init__(self, couples, format=None):
+        # Set the couples
+        self.couples = couples
+
+        # Set the format, falling back to the default format
+        self.format = format if format in self.formats else self.default_format
+
+    # Property to get the content type of the format
+    @property
+    def content_type(self):
+        return self.formats[self.format][0]
+
+    # Method to get the file name of the export
+    def filename(self, name):
+        return f"{name}.{self.formats[self.format][1]}"
+
+    # Protected method to get the rows of a couple
+    def _couple_rows(self, couple):
+        # Get the default score and weight
+        default_score = Grade._meta.get_field("score").default
+        default_weight = CategoryWeight._meta.get_field("weight").default
+
+        # Get the categories, homebuyers and weights, which grow with the couple only
+        categories = list(couple.category_set.order_by("id"))
+        homebuyers = list(couple.homebuyer_set.select_related("user").order_by("id"))
+        weights = {
+            (category_id, homebuyer_id): weight
+            for category_id, homebuyer_id, weight in CategoryWeight.objects.filter(
+                homebuyer__couple=couple
+            )
+            .order_by()
+            .values_list("category_id", "homebuyer_id", "weight")
+        }
+
+        # Stream the houses and their grades in the same order
+        houses = couple.house_set.order_by("id").iterator(chunk_size=self.chunk_size)
+        grades = itertools.groupby(
+            Grade.objects.filter(homebuyer__couple=couple, house__couple=couple)
+            .order_by("house_id")
+            .values_list("house_id", "category_id", "homebuyer_id", "score")
+            .iterator(chunk_size=self.chunk_size),
+            key=lambda grade: grade[0],
+        )
+
+        # Get the grades of the first graded house
+        house_id, house_grades = next(grades, (None, ()))
+
+        # Traverse the houses
+        for house in houses:
+            # Map the grades of the house if it is the next graded house
+            scores = {}
+            if house_id == house.id:
+                scores = {
+                    (category_id, homebuyer_id): score
+                    for _, category_id, homebuyer_id, score in house_grades
+                }
+                house_id, house_grades = next(grades, (None, ()))
+
+            # Yield a row for every category and homebuyer, reading missing values as the defaults
+            for category in categories:
+                for homebuyer in homebuyers:
+                    yield (
+                        couple.id,
+                        house.id,
+                        house.nickname,
+                        house.address,
+                        category.id,
+                        category.summary,
+                        homebuyer.id,
+                        str(homebuyer),
+                        weights.get((category.id, homebuyer.id), default_weight),
+                        scores.get((category.id, homebuyer.id), default_score),
+                    )
+
+    # Method to get the rows of all the couples
+    def rows(self):
+        for couple in self.couples:
+            yield from self._couple_rows(couple)
+
+    # Method to get the encoded lines of the export
+    def lines(self):
+        return self.formats[self.format][2](self.columns, self.rows())
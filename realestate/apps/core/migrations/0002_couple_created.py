@@ -0,0 +1,24 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='couple',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Created'),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='couple',
+            index=models.Index(fields=['realtor', 'created'], name='core_couple_realtor_d49824_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0002_couple_created"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="homebuyer",
+            name="weighting_mode",
+            field=models.CharField(
+                choices=[
+                    ("direct", "Direct Weights"),
+                    ("pairwise", "Pairwise Comparisons"),
+                ],
+                default="direct",
+                max_length=16,
+                verbose_name="Weighting Mode",
+            ),
+        ),
+    ]
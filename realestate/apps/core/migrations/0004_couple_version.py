@@ -0,0 +1,17 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_homebuyer_weighting_mode"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="couple",
+            name="version",
+            field=models.PositiveIntegerField(default=0, verbose_name="Version"),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 4.2.6 on 2026-10-18 06:19
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_couple_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="couple",
+            name="modified",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, verbose_name="Modified"
+            ),
+        ),
+    ]
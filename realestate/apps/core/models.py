@@ -12,6 +12,7 @@ from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 
 # Set the models that are available for import
@@ -128,11 +129,26 @@ class Person(BaseModel):
 
 # Homebuyer model
 class Homebuyer(Person, ValidateCategoryCoupleMixin):
+    # Set the weighting modes of the categories
+    DIRECT_WEIGHTS = "direct"
+    PAIRWISE_WEIGHTS = "pairwise"
+
     # Foreign key for the couple
     couple = models.ForeignKey(
         "core.Couple", verbose_name="Couple", on_delete=models.CASCADE
     )
 
+    # Char field for the weighting mode of the categories
+    weighting_mode = models.CharField(
+        max_length=16,
+        choices=(
+            (DIRECT_WEIGHTS, "Direct Weights"),
+            (PAIRWISE_WEIGHTS, "Pairwise Comparisons"),
+        ),
+        default=DIRECT_WEIGHTS,
+        verbose_name="Weighting Mode",
+    )
+
     # Many to many field for the categories
     categories = models.ManyToManyField(
         "categories.Category",
@@ -149,25 +165,21 @@ class Homebuyer(Person, ValidateCategoryCoupleMixin):
     def role_type(self):
         return "Homebuyer"
 
-    # Method to get the ungraded houses
+    # Method to get the ungraded house and category ids
     def ungraded_house_categories(self):
-        # Get the set of all houses, categories, and grades
-        houses = self.couple.house_set.all()
-        categories = self.couple.category_set.all()
-        grades = self.grade_set.values_list("house_id", "category_id")
-
-        # Use itertools to get the product of the houses and categories
-        house_categories = itertools.product(houses, categories)
-
-        # Function to filter the ungraded houses
-        def _ungraded_filter(house_category):
-            house, category = house_category
-
-            # Return the house and category if the grade is not in the grades
-            return (house.id, category.id) not in grades
-
-        # Return the filtered house categories
-        return filter(_ungraded_filter, house_categories)
+        # Get the ids of all the houses and categories of the couple
+        house_ids = self.couple.house_set.order_by().values_list("id", flat=True)
+        category_ids = self.couple.category_set.order_by().values_list("id", flat=True)
+
+        # Get the set of graded house and category ids
+        graded = set(self.grade_set.order_by().values_list("house_id", "category_id"))
+
+        # Return the house and category ids that are not in the graded set
+        return (
+            house_category
+            for house_category in itertools.product(house_ids, category_ids)
+            if house_category not in graded
+        )
 
     # Method to get the ungraded categories
     def unweighted_categories(self):
@@ -176,7 +188,7 @@ class Homebuyer(Person, ValidateCategoryCoupleMixin):
 
     # Method to check if the user can view the report for the couple
     def can_view_report_for_couple(self, couple_id):
-        return self.couple_id == couple_id
+        return str(self.couple_id) == str(couple_id)
 
     # Method to clean the fields
     def clean(self):
@@ -209,18 +221,32 @@ class Homebuyer(Person, ValidateCategoryCoupleMixin):
     # Method to get the partner
     @property
     def partner(self):
-        # Get the related homebuyers for the couple
-        related_homebuyers = self.couple.homebuyer_set.exclude(id=self.id)
+        # Get up to two related homebuyers for the couple in a single query
+        related_homebuyers = list(
+            Homebuyer.objects.filter(couple_id=self.couple_id).exclude(id=self.id)[:2]
+        )
 
-        # If the related homebuyers count is greater than 1
-        if related_homebuyers.count() > 1:
+        # If there is more than 1 related homebuyer
+        if len(related_homebuyers) > 1:
             # Raise an integrity error
             raise IntegrityError(
                 f"Couple has too many related Homebuyers and should be resolved immediately. (Couple ID: {self.couple_id})"
             )
 
-        # Return the first related homebuyer
-        return related_homebuyers.first()
+        # Return the related homebuyer, if any
+        return related_homebuyers[0] if related_homebuyers else None
+
+    # Class method to keep track of the couple loaded from the database
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        # Get the instance from the parent class
+        instance = super(Homebuyer, cls).from_db(db, field_names, values)
+
+        # Store the loaded couple id
+        instance._loaded_couple_id = dict(zip(field_names, values)).get("couple_id")
+
+        # Return the instance
+        return instance
 
     # Method to check if the homebuyer is registered
     @property
@@ -274,6 +300,13 @@ class Realtor(Person):
         verbose_name_plural = "Realtors"
 
 
+# Queryset for the couples
+class CoupleQuerySet(models.QuerySet):
+    # Method to bump the version and the modified time of the couples
+    def bump_version(self):
+        return self.update(version=models.F("version") + 1, modified=timezone.now())
+
+
 # Couple model
 class Couple(BaseModel):
     # Create a foreign key for the realtor
@@ -281,6 +314,18 @@ class Couple(BaseModel):
         "core.Realtor", verbose_name="Realtor", on_delete=models.CASCADE
     )
 
+    # Date time field for the creation time
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Created")
+
+    # Version of the grades, weights, houses and categories of the couple
+    version = models.PositiveIntegerField(default=0, verbose_name="Version")
+
+    # Date time field for the time of the last version bump
+    modified = models.DateTimeField(default=timezone.now, verbose_name="Modified")
+
+    # Set the manager for the model
+    objects = CoupleQuerySet.as_manager()
+
     # String representation
     def __str__(self):
         return ", ".join((str(hb) if hb else "?" for hb in self._homebuyers()))
@@ -303,6 +348,10 @@ class Couple(BaseModel):
         # Return both the homebuyers
         return homebuyers
 
+    # Method to get the cache key of the couple data at its current version
+    def cache_key(self, *parts):
+        return ":".join(map(str, ("couple", self.id, self.version) + parts))
+
     # Method to get the homebuyers
     def report_url(self):
         # If the id is not set
@@ -317,6 +366,9 @@ class Couple(BaseModel):
         # Set the field to be ordered by
         ordering = ["realtor"]
 
+        # Set the index for the realtor client list
+        indexes = [models.Index(fields=["realtor", "created"])]
+
         # Set the verbose names
         verbose_name = "Couple"
         verbose_name_plural = "Couples"
@@ -0,0 +1,110 @@
+# Django imports
+from django.db.models import F
+from django.db.models import OuterRef
+from django.db.models import Prefetch
+from django.db.models import Sum
+from django.db.models import Window
+from django.db.models.functions import RowNumber
+
+
+# App imports
+from .annotations import count
+from .annotations import last_activity
+from .annotations import progress
+from .models import Homebuyer
+from realestate.apps.categories.models import Category
+from realestate.apps.categories.models import HouseScore
+from realestate.apps.house.models import House
+
+
+# Class to compute the portfolio of a realtor with a fixed number of queries
+class Portfolio(object):
+    # Constructor
+    def __init__(self, realtor):
+        # Set the realtor
+        self.realtor = realtor
+
+        # Get the couples with their aggregates and the top house of each couple
+        self.couples = list(self._couples())
+        self.top_houses = self._top_houses()
+
+    # Protected method to get the couples of the realtor with their aggregates
+    def _couples(self):
+        return (
+            self.realtor.couple_set.annotate(
+                house_count=count(House.objects.filter(couple=OuterRef("pk"))),
+                category_count=count(Category.objects.filter(couple=OuterRef("pk"))),
+                progress=progress(),
+                last_activity=last_activity(),
+            )
+            .prefetch_related(
+                Prefetch(
+                    "homebuyer_set", queryset=Homebuyer.objects.select_related("user")
+                )
+            )
+            .order_by("-last_activity")
+        )
+
+    # Protected method to map the couples to their top ranked house
+    def _top_houses(self):
+        # Rank the houses of each couple by their combined score in a single query, skipping the pairwise couples
+        rows = (
+            HouseScore.objects.filter(house__couple__realtor=self.realtor)
+            .exclude(
+                house__couple__homebuyer__weighting_mode=Homebuyer.PAIRWISE_WEIGHTS
+            )
+            .order_by()
+            .values("house__couple", "house", "house__nickname")
+            .annotate(score=Sum("total"))
+            .annotate(
+                position=Window(
+                    RowNumber(),
+                    partition_by=F("house__couple"),
+                    order_by=[F("score").desc(), F("house__nickname").asc()],
+                )
+            )
+            .filter(position=1)
+        )
+
+        # Return the top house and score of each couple
+        return {
+            row["house__couple"]: {
+                "id": row["house"],
+                "nickname": row["house__nickname"],
+                "score": row["score"],
+            }
+            for row in rows
+        }
+
+    # Property to get the rows of the portfolio
+    @property
+    def rows(self):
+        return [
+            {
+                "couple": couple,
+                "homebuyers": couple.homebuyer_set.all(),
+                "top_house": self.top_houses.get(couple.id),
+                "pairwise": any(
+                    homebuyer.weighting_mode == Homebuyer.PAIRWISE_WEIGHTS
+                    for homebuyer in couple.homebuyer_set.all()
+                ),
+            }
+            for couple in self.couples
+        ]
+
+    # Property to get the totals of the portfolio
+    @property
+    def totals(self):
+        # Get the number of couples
+        couples = len(self.couples)
+
+        # Return the totals
+        return {
+            "couples": couples,
+            "houses": sum(couple.house_count for couple in self.couples),
+            "progress": (
+                sum(couple.progress for couple in self.couples) / couples
+                if couples
+                else 0
+            ),
+        }
@@ -0,0 +1,470 @@
+# Import numpy
+import numpy as np
+
+
+# Django imports
+from django.conf import settings
+from django.core.cache import cache
+
+
+# App imports
+from realestate.apps.categories.models import CategoryWeight
+from realestate.apps.categories.models import Grade
+from realestate.apps.categories.pairwise import pairwise_weights
+from realestate.apps.core.models import Homebuyer
+
+
+# Function to divide the arrays, with the fill value where the divisor is zero
+def _divide(dividend, divisor, fill=0.0):
+    # Broadcast the arrays to the shape of the result
+    dividend, divisor = np.broadcast_arrays(dividend, divisor)
+
+    # Return the quotient
+    return np.divide(
+        dividend, divisor, out=np.full(dividend.shape, fill), where=divisor != 0
+    )
+
+
+# Function to get the competition ranks of the scores along the last axis
+def _competition_ranks(scores):
+    return 1 + (scores[..., None, :] > scores[..., :, None]).sum(axis=-1)
+
+
+# Function to get the average ranks of the values along the first axis, ties share their mean rank
+def _average_ranks(values):
+    # Count the values below and tied with each value
+    below = (values[None, ...] < values[:, None, ...]).sum(axis=1)
+    tied = (values[None, ...] == values[:, None, ...]).sum(axis=1)
+
+    # Return the ranks, starting from one
+    return below + (tied + 1) / 2
+
+
+# Function to get the Spearman rank correlations of the values along the first axis
+def _spearman(x, y):
+    # Center the average ranks of both values
+    x = _average_ranks(x)
+    y = _average_ranks(y)
+    x = x - x.mean(axis=0)
+    y = y - y.mean(axis=0)
+
+    # Return the correlations, undefined where either ranking is constant
+    return _divide(
+        (x * y).sum(axis=0),
+        np.sqrt((x**2).sum(axis=0) * (y**2).sum(axis=0)),
+        fill=np.nan,
+    )
+
+
+# Function to rank the houses by the weighted sum of the scores
+def _weighted_sum(report):
+    # Get the per homebuyer and combined weighted sums
+    homebuyer_scores = report.homebuyer_scores
+    house_scores = homebuyer_scores.sum(axis=1)
+
+    # Return the scores and the percentage of the best possible score
+    return (
+        homebuyer_scores,
+        house_scores,
+        100 * _divide(house_scores, report.max_house_score),
+    )
+
+
+# Function to get the TOPSIS closeness of the houses over the criteria axes
+def _closeness(weighted, axes):
+    # Get the ideal and anti ideal values of each criterion
+    best = weighted.max(axis=0, keepdims=True)
+    worst = weighted.min(axis=0, keepdims=True)
+
+    # Get the distances to the ideal and anti ideal houses
+    to_best = np.sqrt(((weighted - best) ** 2).sum(axis=axes))
+    to_worst = np.sqrt(((weighted - worst) ** 2).sum(axis=axes))
+
+    # Return the relative closeness, a tie when all houses are equal
+    return _divide(to_worst, to_best + to_worst, fill=0.5)
+
+
+# Function to rank the houses by their closeness to the ideal house
+def _topsis(report):
+    # Normalize each criterion by its vector norm over the houses
+    normalized = _divide(
+        report.scores, np.sqrt((report.scores**2).sum(axis=0, keepdims=True))
+    )
+
+    # Get the closeness for each homebuyer over their own normalized weights
+    homebuyer_scores = 100 * _closeness(
+        normalized * _divide(report.weights, report.weights.sum(axis=0)), axes=1
+    )
+
+    # Get the combined closeness over the criteria of both homebuyers
+    house_scores = 100 * _closeness(
+        normalized * _divide(report.weights, report.weights.sum()), axes=(1, 2)
+    )
+
+    # Return the scores, the closeness is already a percentage
+    return homebuyer_scores, house_scores, house_scores
+
+
+# Function to rank the houses by the Borda count of the homebuyer rankings
+def _borda(report):
+    # Get the weighted sums of each homebuyer
+    sums = report.homebuyer_scores
+
+    # Count the houses ranked below and tied with each house by each homebuyer
+    below = (sums[None, :, :] < sums[:, None, :]).sum(axis=1)
+    tied = (sums[None, :, :] == sums[:, None, :]).sum(axis=1) - 1
+
+    # Get the points of each homebuyer, averaging the tied positions
+    homebuyer_scores = below + tied / 2
+    house_scores = homebuyer_scores.sum(axis=1)
+
+    # Get the most points a house can get
+    max_points = homebuyer_scores.shape[1] * (homebuyer_scores.shape[0] - 1)
+
+    # Return the points and the percentage of the most points
+    return homebuyer_scores, house_scores, 100 * _divide(house_scores, max_points)
+
+
+# Floor of the normalized scores of the weighted product, keeps the logarithm finite
+_PRODUCT_FLOOR = 0.01
+
+
+# Function to rank the houses by the weighted product of the normalized scores
+def _weighted_product(report):
+    # Min max normalize each criterion over the houses, a criterion with a single value is neutral
+    lowest = report.scores.min(axis=0, keepdims=True)
+    normalized = _divide(
+        report.scores - lowest,
+        report.scores.max(axis=0, keepdims=True) - lowest,
+        fill=1.0,
+    )
+
+    # Floor the normalized scores to keep the logarithm finite
+    normalized = np.maximum(normalized, _PRODUCT_FLOOR)
+
+    # Get the weighted products with the normalized weights of each homebuyer
+    homebuyer_scores = np.exp(
+        np.einsum(
+            "hcb,cb->hb",
+            np.log(normalized),
+            _divide(report.weights, report.weights.sum(axis=0)),
+        )
+    )
+
+    # Get the geometric mean of the homebuyer products
+    house_scores = np.exp(
+        _divide(np.log(homebuyer_scores).sum(axis=1), homebuyer_scores.shape[1])
+    )
+
+    # Return the products as percentages
+    return 100 * homebuyer_scores, 100 * house_scores, 100 * house_scores
+
+
+# Ranking methods of the report by name, with their labels
+RANKING_METHODS = {
+    "weighted_sum": ("Weighted Sum", _weighted_sum),
+    "topsis": ("TOPSIS", _topsis),
+    "borda": ("Borda Count", _borda),
+    "weighted_product": ("Weighted Product", _weighted_product),
+}
+
+
+# Default ranking method of the report
+DEFAULT_RANKING_METHOD = "weighted_sum"
+
+
+# Class to compute the weighted house scores for a couple
+class CoupleReport(object):
+    # Constructor
+    def __init__(self, couple):
+        # Set the couple
+        self.couple = couple
+
+        # Get the homebuyers, houses and categories of the couple
+        self.homebuyers = list(
+            couple.homebuyer_set.select_related("user").order_by("id")
+        )
+        self.houses = list(couple.house_set.all())
+        self.categories = list(couple.category_set.all())
+
+        # Get the default score and weight
+        self.default_score = Grade._meta.get_field("score").default
+        self.default_weight = CategoryWeight._meta.get_field("weight").default
+
+        # Get the min and max scores
+        self.min_score = min(dict(Grade._meta.get_field("score").choices))
+        self.max_score = max(dict(Grade._meta.get_field("score").choices))
+
+        # Get the min and max weights
+        self.min_weight = min(dict(CategoryWeight._meta.get_field("weight").choices))
+        self.max_weight = max(dict(CategoryWeight._meta.get_field("weight").choices))
+
+        # Build the score and weight arrays
+        self.scores = self._score_array()
+        self.weights = self._weight_array()
+
+    # Class method to get the report of the couple at its version, computed on a cache miss
+    @classmethod
+    def cached(cls, couple):
+        return cache.get_or_set(
+            couple.cache_key("report"),
+            lambda: cls(couple),
+            settings.COUPLE_CACHE_TIMEOUT,
+        )
+
+    # Protected method to get the index maps for the houses, categories and homebuyers
+    def _index(self, objects):
+        return {obj.id: index for index, obj in enumerate(objects)}
+
+    # Protected method to map the rows to array indices
+    def _indices(self, rows, *index_maps):
+        # Keep only the rows whose keys are all known
+        rows = [
+            row
+            for row in rows
+            if all(key in index_map for key, index_map in zip(row, index_maps))
+        ]
+
+        # Split the rows into index columns and a value column
+        columns = [
+            np.array([index_map[row[i]] for row in rows], dtype=np.intp)
+            for i, index_map in enumerate(index_maps)
+        ]
+        values = np.array([row[-1] for row in rows], dtype=np.float64)
+
+        # Return the index columns and the values
+        return tuple(columns), values
+
+    # Protected method to build the houses x categories x homebuyers score array
+    def _score_array(self):
+        # Create the array filled with the default score
+        scores = np.full(
+            (len(self.houses), len(self.categories), len(self.homebuyers)),
+            self.default_score,
+            dtype=np.float64,
+        )
+
+        # Get all the grades of the couple in a single query
+        grades = (
+            Grade.objects.filter(homebuyer__couple=self.couple)
+            .order_by()
+            .values_list("house_id", "category_id", "homebuyer_id", "score")
+        )
+
+        # Scatter the grades into the array
+        indices, values = self._indices(
+            grades,
+            self._index(self.houses),
+            self._index(self.categories),
+            self._index(self.homebuyers),
+        )
+        scores[indices] = values
+
+        # Return the scores
+        return scores
+
+    # Protected method to build the categories x homebuyers weight array
+    def _weight_array(self):
+        # Create the array filled with the default weight
+        weights = np.full(
+            (len(self.categories), len(self.homebuyers)),
+            self.default_weight,
+            dtype=np.float64,
+        )
+
+        # Get all the weights of the couple in a single query
+        category_weights = (
+            CategoryWeight.objects.filter(homebuyer__couple=self.couple)
+            .order_by()
+            .values_list("category_id", "homebuyer_id", "weight")
+        )
+
+        # Scatter the weights into the array
+        indices, values = self._indices(
+            category_weights,
+            self._index(self.categories),
+            self._index(self.homebuyers),
+        )
+        weights[indices] = values
+
+        # Get the homebuyers that weigh the categories by pairwise comparisons
+        pairwise = [
+            index
+            for index, homebuyer in enumerate(self.homebuyers)
+            if homebuyer.weighting_mode == Homebuyer.PAIRWISE_WEIGHTS
+        ]
+
+        # If any homebuyer compares the categories pairwise
+        if pairwise:
+            # Replace their weights with the derived weights, averaging the default weight
+            derived, _ = pairwise_weights(
+                [self.homebuyers[index] for index in pairwise], self.categories
+            )
+            weights[:, pairwise] = derived * len(self.categories) * self.default_weight
+
+        # Return the weights
+        return weights
+
+    # Property to get the weighted houses x homebuyers scores
+    @property
+    def homebuyer_scores(self):
+        return np.einsum("hcb,cb->hb", self.scores, self.weights)
+
+    # Property to get the combined house scores
+    @property
+    def house_scores(self):
+        return self.homebuyer_scores.sum(axis=1)
+
+    # Property to get the best possible combined score
+    @property
+    def max_house_score(self):
+        return self.max_score * self.weights.sum()
+
+    # Method to get the combined house scores and ranks for a batch of hypothetical weights
+    def scenario_rankings(self, scenarios):
+        # Start every scenario from the current weights
+        weights = np.repeat(self.weights[None, :, :], len(scenarios), axis=0)
+
+        # Get the scenario, category and weight of every override
+        category_index = {
+            str(category.id): i for i, category in enumerate(self.categories)
+        }
+        overrides = [
+            (scenario, category_index[str(category_id)], weight)
+            for scenario, changes in enumerate(scenarios)
+            for category_id, weight in changes.items()
+        ]
+
+        # If there are overrides
+        if overrides:
+            # Set the overridden category weights for all the homebuyers
+            scenario, category, weight = (
+                np.array(column) for column in zip(*overrides)
+            )
+            weights[scenario, category] = weight[:, None]
+
+        # Get the scenarios x houses combined scores in a single product
+        scores = np.einsum("hcb,scb->sh", self.scores, weights)
+
+        # Return the scores and the ranks of the houses in each scenario
+        return scores, _competition_ranks(scores)
+
+    # Method to get the weights of each category that keep the top house on top
+    def stability_intervals(self):
+        # If there are no houses, there is no top house
+        if not self.houses:
+            return None, np.zeros(0), np.zeros(0), np.zeros(0, dtype=bool)
+
+        # Get the combined scores and the top house
+        house_scores = self.house_scores
+        top = int(house_scores.argmax())
+
+        # Each score is linear in the weight of a category given to both homebuyers
+        slopes = self.scores.sum(axis=2).T
+        intercepts = house_scores[None, :] - np.einsum(
+            "hcb,cb->ch", self.scores, self.weights
+        )
+
+        # Get the margins of the top house over every house for each category
+        slope_margins = slopes[:, [top]] - slopes
+        intercept_margins = intercepts - intercepts[:, [top]]
+
+        # Get the weights where the top house catches up with each house
+        crossings = _divide(intercept_margins, slope_margins)
+
+        # Get the bounds from the houses that gain and lose against the top house
+        lower = np.where(slope_margins > 0, crossings, -np.inf).max(axis=1)
+        upper = np.where(slope_margins < 0, crossings, np.inf).min(axis=1)
+
+        # Find the categories where a house beats the top house at any weight
+        beaten = ((slope_margins == 0) & (intercept_margins > 0)).any(axis=1)
+
+        # Find the intervals that exist and overlap the weight scale, before clipping
+        exists = (
+            (lower <= upper)
+            & (lower <= self.max_weight)
+            & (upper >= self.min_weight)
+            & ~beaten
+        )
+
+        # Clip the bounds to the weight scale
+        lower = np.clip(lower, self.min_weight, self.max_weight)
+        upper = np.clip(upper, self.min_weight, self.max_weight)
+
+        # Return the top house, the bounds and whether each interval exists
+        return self.houses[top], lower, upper, exists
+
+    # Method to get the agreement between the two homebuyers of the couple
+    def agreement(self, contested=5):
+        # The agreement needs two homebuyers and some houses to compare
+        if len(self.homebuyers) != 2 or not self.houses:
+            return None
+
+        # Get the grades and weighted scores of each homebuyer
+        first, second = self.scores[..., 0], self.scores[..., 1]
+        homebuyer_scores = self.homebuyer_scores
+
+        # Get the grade differences of every house and category
+        differences = np.abs(first - second)
+
+        # Get the rank correlations of the grades per category and of the scores overall
+        category_correlations = _spearman(first, second)
+        correlation = _spearman(homebuyer_scores[:, 0], homebuyer_scores[:, 1])
+
+        # Get the weighted score differences of the houses
+        score_differences = np.abs(homebuyer_scores[:, 0] - homebuyer_scores[:, 1])
+
+        # Get the most contested houses, skipping the houses both agree on
+        houses = [
+            index
+            for index in np.argsort(-score_differences, kind="stable")[:contested]
+            if score_differences[index] > 0
+        ]
+
+        # Return the agreement, with undefined correlations as None
+        return {
+            "correlation": None if np.isnan(correlation) else float(correlation),
+            "categories": [
+                {
+                    "category": self.categories[index],
+                    "difference": float(differences[:, index].mean()),
+                    "correlation": None
+                    if np.isnan(category_correlations[index])
+                    else float(category_correlations[index]),
+                }
+                for index in np.argsort(-differences.mean(axis=0), kind="stable")
+            ],
+            "houses": [
+                {
+                    "house": self.houses[index],
+                    "homebuyer_scores": homebuyer_scores[index].tolist(),
+                    "difference": float(score_differences[index]),
+                    "grade_difference": float(differences[index].mean()),
+                }
+                for index in houses
+            ],
+        }
+
+    # Method to get the ranked report rows
+    def rows(self, method=DEFAULT_RANKING_METHOD):
+        # If there are no houses, there is nothing to rank
+        if not self.houses:
+            return []
+
+        # Get the per homebuyer scores, combined scores and percentages of the method
+        homebuyer_scores, house_scores, percents = RANKING_METHODS[method][1](self)
+
+        # Get the competition ranks of the houses
+        ranks = _competition_ranks(house_scores)
+
+        # Return the rows ordered by rank
+        return [
+            {
+                "rank": int(ranks[index]),
+                "house": self.houses[index],
+                "homebuyer_scores": homebuyer_scores[index].tolist(),
+                "score": float(house_scores[index]),
+                "percent": float(percents[index]),
+            }
+            for index in np.argsort(-house_scores, kind="stable")
+        ]
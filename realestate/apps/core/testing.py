@@ -0,0 +1,43 @@
+# App imports
+from realestate.apps.appauth.models import User
+from realestate.apps.categories.models import Category
+from realestate.apps.core.models import Couple
+from realestate.apps.core.models import Homebuyer
+from realestate.apps.core.models import Realtor
+from realestate.apps.house.models import House
+
+
+# Function to create a user for the tests
+def create_user(email):
+    return User.objects.create_user(
+        username=email,
+        email=email,
+        password="password",
+        first_name="First",
+        last_name=email.split("@")[0],
+    )
+
+
+# Function to create a homebuyer in a new couple with the given number of categories and houses
+def create_homebuyer(name, categories=0, houses=0):
+    # Create the realtor and the couple
+    realtor = Realtor.objects.create(user=create_user(f"{name}-realtor@example.com"))
+    couple = Couple.objects.create(realtor=realtor)
+
+    # Create the homebuyer
+    homebuyer = Homebuyer.objects.create(
+        user=create_user(f"{name}@example.com"), couple=couple
+    )
+
+    # Add categories up to the number of categories, after the default categories
+    for index in range(couple.category_set.count(), categories):
+        Category.objects.create(couple=couple, summary=f"Category {index}")
+
+    # Create the houses
+    for index in range(houses):
+        House.objects.create(
+            couple=couple, nickname=f"House {index}", address="Address"
+        )
+
+    # Return the homebuyer
+    return homebuyer
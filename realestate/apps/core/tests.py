@@ -0,0 +1,127 @@
+# Import base64 and json
+import base64
+import json
+
+
+# Django imports
+from django.test import TestCase
+from django.urls import reverse
+
+
+# App imports
+from realestate.apps.core.models import Couple
+from realestate.apps.core.models import Homebuyer
+from realestate.apps.core.models import Realtor
+from realestate.apps.core.testing import create_user
+from realestate.apps.house.models import House
+from realestate.apps.pending.models import PendingCouple
+from realestate.apps.pending.models import PendingHomebuyer
+
+
+# Test case for the realtor dashboard
+class RealtorHomeViewTestCase(TestCase):
+    # Set the number of queries of the dashboard, whatever the number of clients
+    _QUERY_COUNT = 7
+
+    # Class method to create a realtor with couples and pending couples
+    @classmethod
+    def _create_realtor(cls, name, couples, pending_couples):
+        # Create the realtor
+        realtor = Realtor.objects.create(user=create_user(f"{name}@example.com"))
+
+        # Create the couples with two homebuyers and a house
+        for index in range(couples):
+            couple = Couple.objects.create(realtor=realtor)
+            House.objects.create(couple=couple, nickname="House", address="Address")
+            for member in range(2):
+                Homebuyer.objects.create(
+                    user=create_user(f"{name}-{index}-{member}@example.com"),
+                    couple=couple,
+                )
+
+        # Create the pending couples with two pending homebuyers, the first registered
+        for index in range(pending_couples):
+            pending_couple = PendingCouple.objects.create(realtor=realtor)
+            for member in range(2):
+                email = f"{name}-pending-{index}-{member}@example.com"
+                PendingHomebuyer.objects.create(
+                    email=email,
+                    first_name="First",
+                    last_name="Last",
+                    pending_couple=pending_couple,
+                )
+                if not member:
+                    create_user(email)
+
+        # Return the realtor
+        return realtor
+
+    # Class method to create the realtors of the tests
+    @classmethod
+    def setUpTestData(cls):
+        # Run the backfill of the default weights and grades inside the test transaction
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.small_realtor = cls._create_realtor(
+                "small", couples=2, pending_couples=1
+            )
+            cls.large_realtor = cls._create_realtor(
+                "large", couples=50, pending_couples=10
+            )
+
+    # Protected method to get the dashboard of a realtor in the fixed number of queries
+    def _assert_dashboard_queries(self, realtor):
+        # Log the realtor in
+        self.client.force_login(realtor.user)
+
+        # Get the dashboard
+        with self.assertNumQueries(self._QUERY_COUNT):
+            response = self.client.get(reverse("home"))
+
+        # Check the dashboard lists clients
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["couple_data"])
+
+    # Test the dashboard of a realtor with a few couples
+    def test_small_realtor_query_count(self):
+        self._assert_dashboard_queries(self.small_realtor)
+
+    # Test the dashboard of a realtor with many couples and pending couples
+    def test_large_realtor_query_count(self):
+        self._assert_dashboard_queries(self.large_realtor)
+
+    # Test a tampered or stale cursor falls back to the first page
+    def test_garbage_cursor(self):
+        # Log the realtor in
+        self.client.force_login(self.small_realtor.user)
+
+        # Get the first page
+        first_page = self.client.get(reverse("home"))
+
+        # Traverse the sorts and the garbage keys
+        for sort, key in [
+            ("progress", ["abc", "abc", 0, "abc"]),
+            ("progress", [None, None, None, None]),
+            ("-created", [[1], {}, 0, "abc"]),
+            ("name", ["a", "b"]),
+        ]:
+            # Encode the cursor
+            cursor = base64.urlsafe_b64encode(
+                json.dumps({"sort": sort, "key": key}).encode()
+            ).decode()
+
+            # Get the page of the cursor
+            response = self.client.get(
+                reverse("home"), {"sort": sort, "cursor": cursor}
+            )
+
+            # Check the first page is shown
+            self.assertEqual(response.status_code, 200)
+            if sort == "-created":
+                self.assertEqual(
+                    [row[0] for row in response.context["couple_data"]],
+                    [row[0] for row in first_page.context["couple_data"]],
+                )
+
+        # Check a cursor that is not base64 encoded json shows the first page
+        response = self.client.get(reverse("home"), {"cursor": "not a cursor"})
+        self.assertEqual(response.status_code, 200)
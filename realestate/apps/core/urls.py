@@ -3,7 +3,11 @@ from django.urls import path
 
 
 # Import views for the app
+from .views import CoupleExportView
 from .views import HomeView
+from .views import PortfolioView
+from .views import RealtorExportView
+from .views import ReportSensitivityView
 from .views import ReportView
 
 
@@ -11,4 +15,12 @@ from .views import ReportView
 urlpatterns = [
     path("", HomeView.as_view(), name="home"),
     path("report/<str:couple_id>/", ReportView.as_view(), name="report"),
+    path(
+        "report/<str:couple_id>/sensitivity/",
+        ReportSensitivityView.as_view(),
+        name="report-sensitivity",
+    ),
+    path("portfolio/", PortfolioView.as_view(), name="portfolio"),
+    path("export/", RealtorExportView.as_view(), name="export"),
+    path("export/<str:couple_id>/", CoupleExportView.as_view(), name="couple-export"),
 ]
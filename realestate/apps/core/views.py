@@ -1,20 +1,86 @@
+# Import collections
+import collections
+
+
 # Django imports
+from django.conf import settings
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
+from django.db.models import F
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django.shortcuts import render
 from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic import View
 
 
 # App imports
+from .clients import ClientList
+from .exports import CoupleExport
 from .models import Couple
+from .models import Homebuyer
 from .models import Realtor
+from .portfolio import Portfolio
+from .reports import CoupleReport
+from .reports import DEFAULT_RANKING_METHOD
+from .reports import RANKING_METHODS
 from realestate.apps.appauth.models import User
+from realestate.apps.categories.models import Grade
 from realestate.apps.house.models import House
-from realestate.apps.core.models import Homebuyer
-from realestate.apps.pending.models import PendingHomebuyer
-from realestate.apps.pending.models import PendingCouple
+
+
+# Function to check if the string is a number
+def _is_number(value):
+    # Try to convert the value to a float
+    try:
+        float(value)
+
+    # If the value is not a number
+    except ValueError:
+        return False
+
+    # Return true
+    return True
+
+
+# Function to get the couple shown by a conditional get request
+def _conditional_couple(request):
+    # Skip the conditional response while flash messages are pending
+    if len(messages.get_messages(request)):
+        return None
+
+    # Return the couple loaded by the view, or the couple of the homebuyer
+    return getattr(request, "shown_couple", request.couple)
+
+
+# Function to get the etag of the couple page for the user
+def _couple_etag(request, *args, **kwargs):
+    # Get the couple of the request
+    couple = _conditional_couple(request)
+
+    # Return the etag, none when the page does not show a couple
+    return f"{couple.id}-{couple.version}-{request.user.pk}" if couple else None
+
+
+# Function to get the last modified time of the couple page
+def _couple_last_modified(request, *args, **kwargs):
+    # Get the couple of the request
+    couple = _conditional_couple(request)
+
+    # Return the modified time, none when the page does not show a couple
+    return couple.modified if couple else None
+
+
+# Decorators to answer unchanged couple pages without forms with a 304, revalidated on every request
+couple_conditional_get = [
+    cache_control(private=True, no_cache=True),
+    condition(etag_func=_couple_etag, last_modified_func=_couple_last_modified),
+]
 
 
 # Base view for all views
@@ -29,8 +95,8 @@ class BaseView(View):
     # Dispatch method with login required decorator
     @method_decorator(login_required)
     def dispatch(self, request, *args, **kwargs):
-        # Get the role of the user
-        role = request.user.role_object
+        # Get the role of the user resolved for the request
+        role = request.role
 
         # If the user has the role type in the allowed user types
         if role.role_type in self._USER_TYPES_ALLOWED:
@@ -49,69 +115,129 @@ class HomeView(BaseView):
     homebuyer_template_name = "core/homebuyer_home.html"
     realtor_template_name = "core/realtor_home.html"
 
+    # Set the orderings of the house sorts
+    _HOUSE_SORTS = {
+        "score": F("score").desc(nulls_last=True),
+        "combined": F("combined_score").desc(nulls_last=True),
+        "nickname": F("nickname").asc(),
+    }
+
+    # Method to get the houses with the evaluation progress of the homebuyer and the partner
+    def _evaluated_houses(self, couple, homebuyer, houses):
+        # Get the evaluated grade counts of every house of the couple in a single query
+        counts = Grade.objects.filter(homebuyer__couple=couple).evaluated_counts()
+
+        # Split the counts between the homebuyer and the partner
+        evaluated = collections.Counter()
+        partner_evaluated = collections.Counter()
+        for (house_id, homebuyer_id), count in counts.items():
+            if homebuyer_id == homebuyer.id:
+                evaluated[house_id] += count
+            else:
+                partner_evaluated[house_id] += count
+
+        # Get the number of categories and houses of the couple
+        category_count = couple.category_set.count()
+        house_count = couple.house_set.count()
+
+        # Set the progress of each house
+        houses = list(houses)
+        for house in houses:
+            house.evaluated = evaluated[house.id]
+            house.partner_evaluated = partner_evaluated[house.id]
+
+        # Return the houses and the progress over all the houses of the couple
+        return houses, {
+            "categories": category_count,
+            "gradable": category_count * house_count,
+            "evaluated": sum(evaluated.values()),
+            "partner_evaluated": sum(partner_evaluated.values()),
+        }
+
     # Method to handle the homebuyer get request
     def _homebuyer_get(self, request, homebuyer, *args, **kwargs):
         # Get the couple of the homebuyer
         couple = homebuyer.couple
 
-        # Get the houses of the couple
-        house = House.objects.filter(couple=couple)
+        # Get the houses of the couple with the scores of the homebuyer
+        house = House.objects.with_scores(couple, homebuyer)
 
-        # Prepare the context
-        context = {"couple": couple, "house": house}
+        # Get the sort and the filters of the houses
+        sort = request.GET.get("sort")
+        min_score = request.GET.get("min_score", "")
+        top = request.GET.get("top", "")
 
-        # Render the template
-        return render(request, self.homebuyer_template_name, context)
+        # Check if the homebuyer compares the categories pairwise, the house scores only follow direct weights
+        pairwise = homebuyer.weighting_mode == Homebuyer.PAIRWISE_WEIGHTS
 
-    # Method to handle the realtor get request
-    def _realtor_get(self, request, realtor, *args, **kwargs):
-        # Get the couples for the realtors
-        couples = Couple.objects.filter(realtor=realtor)
+        # Ignore the sort and the filters that are not valid, and the minimum score of a pairwise homebuyer
+        sort = sort if sort in self._HOUSE_SORTS else None
+        min_score = min_score if min_score.isdigit() and not pairwise else ""
+        top = top if top.isdigit() else ""
 
-        # Get the pending couples for the realtor
-        pending_couples = PendingCouple.objects.filter(realtor=realtor)
+        # Order the houses by the sort, by the score for the top houses, else by the nickname
+        ordering = sort or ("score" if top else "nickname")
+        house = house.order_by(self._HOUSE_SORTS[ordering], "nickname")
 
-        # List to store the couple data
-        couple_data = []
+        # If the minimum score is set
+        if min_score:
+            # Keep only the houses scored at least the minimum score
+            house = house.filter(score__gte=int(min_score))
 
-        # Set the is pending flag
-        is_pending = True
+        # If the number of houses is set
+        if top:
+            # Keep only the top houses
+            house = house[: int(top)]
 
-        # If couple is pending
-        has_pending = pending_couples.exists()
+        # Get the houses and the progress from the cache, keyed by the couple version and the query
+        house, progress = cache.get_or_set(
+            couple.cache_key("home", homebuyer.id, sort, min_score, top),
+            lambda: self._evaluated_houses(couple, homebuyer, house),
+            settings.COUPLE_CACHE_TIMEOUT,
+        )
 
-        # Traverse the couples
-        for couple in couples:
-            # Get the homebuyer
-            homebuyer = Homebuyer.objects.filter(couple=couple)
+        # Prepare the context
+        context = {
+            "couple": couple,
+            "house": house,
+            "sort": sort,
+            "progress": progress,
+            "pairwise": pairwise,
+        }
 
-            # Update the couple data
-            couple_data.append((couple, homebuyer, is_pending))
+        # Render the template
+        return render(request, self.homebuyer_template_name, context)
 
-        # Traverse the pending couples
-        for pending_couple in pending_couples:
-            # Get the pending homebuyer
-            pending_homebuyer = PendingHomebuyer.objects.filter(
-                pending_couple=pending_couple
-            )
+    # Method to handle the realtor get request
+    def _realtor_get(self, request, realtor, *args, **kwargs):
+        # Get the page of clients of the realtor
+        clients = ClientList(
+            realtor, request.GET.get("sort"), request.GET.get("cursor")
+        )
 
-            # Update the couple data
-            couple_data.append((pending_couple, pending_homebuyer, is_pending))
+        # Get the couple data of the page
+        couple_data = clients.couple_data
+
+        # If couple is pending
+        has_pending = any(is_pending for _, _, is_pending in couple_data)
 
         # Prepare the context
         context = {
             "couple_data": couple_data,
             "realtor": realtor,
             "has_pending": has_pending,
+            "sort": clients.sort,
+            "next_cursor": clients.next_cursor,
         }
 
         # Render the template
         return render(request, self.realtor_template_name, context)
 
     # Method to handle the get request
+    @method_decorator(couple_conditional_get)
     def get(self, request, *args, **kwargs):
-        # Get the role of the user
-        role = request.user.role_object
+        # Get the role of the user resolved for the request
+        role = request.role
 
         # If the user is a homebuyer
         if role.role_type in User._HOMEBUYER_ONLY:
@@ -134,13 +260,203 @@ class ReportView(BaseView):
         # Get the couple id from the kwargs
         couple_id = kwargs.get("couple_id", 0)
 
-        # Get the couple object
-        get_object_or_404(Couple, id=couple_id)
+        # Get the couple object, shared with the conditional get on the request
+        self.couple = request.shown_couple = get_object_or_404(Couple, id=couple_id)
 
         # Return the permission check
         return role.can_view_report_for_couple(couple_id)
 
     # Method to handle the get request
+    @method_decorator(couple_conditional_get)
     def get(self, request, *args, **kwargs):
+        # Get the report for the couple, cached at its version
+        report = CoupleReport.cached(self.couple)
+
+        # Get the ranking method, falling back to the default method
+        method = request.GET.get("method")
+        if method not in RANKING_METHODS:
+            method = DEFAULT_RANKING_METHOD
+
+        # Prepare the context
+        context = {
+            "couple": self.couple,
+            "homebuyers": report.homebuyers,
+            "categories": report.categories,
+            "rows": report.rows(method),
+            "agreement": report.agreement(),
+            "method": method,
+            "methods": [(name, label) for name, (label, _) in RANKING_METHODS.items()],
+        }
+
+        # Render the template
+        return render(request, self.template_name, context)
+
+
+# View for the what-if sensitivity analysis of the report
+class ReportSensitivityView(ReportView):
+    # Set the maximum number of scenarios per request
+    _MAX_SCENARIOS = 100
+
+    # Method to parse the scenarios of the request
+    def _scenarios(self, request, report):
+        # Get the scenarios of the request
+        scenarios = request.GET.getlist("scenario")
+
+        # If there are too many scenarios
+        if len(scenarios) > self._MAX_SCENARIOS:
+            # Raise a value error
+            raise ValueError(f"At most {self._MAX_SCENARIOS} scenarios are allowed.")
+
+        # Get the ids of the categories of the couple
+        category_ids = {str(category.id) for category in report.categories}
+
+        # List to store the weight overrides of each scenario
+        parsed = []
+
+        # Traverse the scenarios
+        for scenario in scenarios:
+            # Dictionary to store the weight overrides of the scenario
+            overrides = {}
+
+            # Traverse the category weights of the scenario
+            for override in filter(None, scenario.split(",")):
+                # Get the category id and the weight
+                category_id, _, weight = override.partition(":")
+                weight = float(weight) if _is_number(weight) else None
+
+                # If the category or the weight are not valid
+                if category_id not in category_ids or not (
+                    weight is not None
+                    and report.min_weight <= weight <= report.max_weight
+                ):
+                    # Raise a value error
+                    raise ValueError(f"Invalid category weight '{override}'.")
+
+                # Update the overrides
+                overrides[category_id] = weight
+
+            # Update the scenarios
+            parsed.append(overrides)
+
+        # Return the scenarios
+        return parsed
+
+    # Method to handle the get request
+    @method_decorator(couple_conditional_get)
+    def get(self, request, *args, **kwargs):
+        # Get the report for the couple, cached at its version
+        report = CoupleReport.cached(self.couple)
+
+        # Parse the scenarios
+        try:
+            scenarios = self._scenarios(request, report)
+
+        # If the scenarios are not valid
+        except ValueError as error:
+            # Return the error
+            return JsonResponse({"error": str(error)}, status=400)
+
+        # Get the rankings of the current weights and of all the scenarios
+        scores, ranks = report.scenario_rankings([{}] + scenarios)
+
+        # Get the stability intervals of the top house
+        top_house, lower, upper, stable = report.stability_intervals()
+
+        # Return the analysis
+        return JsonResponse(
+            {
+                "houses": [
+                    {"id": str(house.id), "nickname": house.nickname}
+                    for house in report.houses
+                ],
+                "current": {"scores": scores[0].tolist(), "ranks": ranks[0].tolist()},
+                "scenarios": [
+                    {
+                        "weights": overrides,
+                        "scores": scenario_scores.tolist(),
+                        "ranks": scenario_ranks.tolist(),
+                    }
+                    for overrides, scenario_scores, scenario_ranks in zip(
+                        scenarios, scores[1:], ranks[1:]
+                    )
+                ],
+                "stability": {
+                    "house": str(top_house.id) if top_house else None,
+                    "categories": [
+                        {
+                            "id": str(category.id),
+                            "summary": category.summary,
+                            "min_weight": float(low) if exists else None,
+                            "max_weight": float(high) if exists else None,
+                        }
+                        for category, low, high, exists in zip(
+                            report.categories, lower, upper, stable
+                        )
+                    ],
+                },
+            }
+        )
+
+
+# Function to stream an export as a file download
+def _export_response(export, name):
+    # Stream the lines of the export
+    response = StreamingHttpResponse(export.lines(), content_type=export.content_type)
+
+    # Set the file name of the download
+    response["Content-Disposition"] = f'attachment; filename="{export.filename(name)}"'
+
+    # Return the response
+    return response
+
+
+# View to export the evaluation data of a couple
+class CoupleExportView(ReportView):
+    # Method to handle the get request
+    def get(self, request, *args, **kwargs):
+        # Get the export of the couple in the requested format
+        export = CoupleExport([self.couple], request.GET.get("format"))
+
+        # Return the streaming response
+        return _export_response(export, f"couple-{self.couple.id}")
+
+
+# View to export the evaluation data of all the couples of a realtor
+class RealtorExportView(BaseView):
+    # Get the allowed user types
+    _USER_TYPES_ALLOWED = User._REALTOR_ONLY
+
+    # Method to handle the get request
+    def get(self, request, *args, **kwargs):
+        # Get the export of the couples of the realtor in the requested format
+        export = CoupleExport(
+            request.role.couple_set.order_by("created").iterator(),
+            request.GET.get("format"),
+        )
+
+        # Return the streaming response
+        return _export_response(export, "couples")
+
+
+# View for the portfolio of a realtor
+class PortfolioView(BaseView):
+    # Get the allowed user types
+    _USER_TYPES_ALLOWED = User._REALTOR_ONLY
+
+    # Set the template name
+    template_name = "core/portfolio.html"
+
+    # Method to handle the get request
+    def get(self, request, *args, **kwargs):
+        # Compute the portfolio of the realtor
+        portfolio = Portfolio(request.role)
+
+        # Prepare the context
+        context = {
+            "realtor": request.role,
+            "rows": portfolio.rows,
+            "totals": portfolio.totals,
+        }
+
         # Render the template
-        return render(request, self.template_name, {})
+        return render(request, self.template_name, context)
@@ -1,10 +1,12 @@
 # Django imports
 from django.contrib import admin
+from django.utils.html import format_html_join
 
 
 # App imports
 from .models import House
 from realestate.apps.categories.inlines import GradeInline
+from realestate.apps.categories.models import Grade
 from realestate.apps.core.admin import BaseAdmin
 
 
@@ -12,13 +14,40 @@ from realestate.apps.core.admin import BaseAdmin
 @admin.register(House)
 class HouseAdmin(BaseAdmin):
     # Set the readonly fields
-    readonly_fields = ("id",)
+    readonly_fields = ("id", "default_grades")
 
     # Set the fields to be displayed in the admin
-    fields = ("id", "nickname", "address", "couple")
+    fields = ("id", "nickname", "address", "couple", "default_grades")
 
     # Set the inlines
     inlines = [GradeInline]
 
     # Set the fields to be displayed in the admin list view
     list_display = ("nickname", "address")
+
+    # Method to get the grades that are read as the default score
+    def default_grades(self, obj):
+        # If the object is not saved, return a dash
+        if not obj.pk:
+            return "-"
+
+        # Get the homebuyers, categories and graded pairs of the house
+        homebuyers = obj.couple.homebuyer_set.select_related("user")
+        categories = obj.couple.category_set.all()
+        graded = set(obj.grade_set.values_list("homebuyer_id", "category_id"))
+
+        # Get the pairs that have no grade
+        missing = [
+            (homebuyer, category.summary)
+            for homebuyer in homebuyers
+            for category in categories
+            if (homebuyer.id, category.id) not in graded
+        ]
+
+        # Return the missing pairs or a dash
+        return format_html_join("", "<div>{}: {}</div>", missing) or "-"
+
+    # Set the default grades description
+    default_grades.short_description = (
+        f"Default Grades (Score {Grade._meta.get_field('score').default})"
+    )
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.6 on 2026-10-18 07:01
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+import django.utils.timezone
+
+
+# Date the existing houses with the creation time of their couple, not the migration time
+def date_existing_houses(apps, schema_editor):
+    Couple = apps.get_model("core", "Couple")
+    House = apps.get_model("house", "House")
+    House.objects.update(
+        created=Subquery(
+            Couple.objects.filter(id=OuterRef("couple_id")).values("created")[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("house", "0001_initial"),
+        ("core", "0002_couple_created"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="house",
+            name="created",
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now,
+                verbose_name="Created",
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(date_existing_houses, migrations.RunPython.noop),
+    ]
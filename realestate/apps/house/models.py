@@ -1,13 +1,57 @@
 # Django imports
 from django.db import models
+from django.db.models import Case
+from django.db.models import Count
+from django.db.models import Q
+from django.db.models import Sum
+from django.db.models import When
 from django.urls import reverse
 
 
 # App imports
 from realestate.apps.core.models import BaseModel
+from realestate.apps.core.models import Homebuyer
 from realestate.apps.core.models import ValidateCategoryCoupleMixin
 
 
+# Queryset for the houses
+class HouseQuerySet(models.QuerySet):
+    # Method to get the houses of the couple of the user
+    def for_user(self, user):
+        return self.filter(couple__homebuyer__user=user)
+
+    # Method to get the houses of the couple annotated with the house scores
+    def with_scores(self, couple, homebuyer=None):
+        # Only the house scores of the homebuyers weighing the categories directly follow their weights
+        direct = Q(housescore__homebuyer__weighting_mode=Homebuyer.DIRECT_WEIGHTS)
+
+        # Annotate the combined score, hidden if a homebuyer compares the categories pairwise
+        annotations = {
+            "combined_score": Case(
+                When(pairwise_scores=0, then=Sum("housescore__total")), default=None
+            )
+        }
+
+        # If the homebuyer is set
+        if homebuyer is not None:
+            # Annotate the scores of the homebuyer and of the partner
+            annotations["score"] = Sum(
+                "housescore__total",
+                filter=Q(housescore__homebuyer=homebuyer) & direct,
+            )
+            annotations["partner_score"] = Sum(
+                "housescore__total",
+                filter=~Q(housescore__homebuyer=homebuyer) & direct,
+            )
+
+        # Return the houses of the couple with the scores
+        return (
+            self.filter(couple=couple)
+            .alias(pairwise_scores=Count("housescore", filter=~direct))
+            .annotate(**annotations)
+        )
+
+
 # House Model
 class House(BaseModel, ValidateCategoryCoupleMixin):
     # Set the minimum length for the nickname
@@ -17,6 +61,9 @@ class House(BaseModel, ValidateCategoryCoupleMixin):
     nickname = models.CharField(max_length=128, verbose_name="Nickname")
     address = models.TextField(blank=True, verbose_name="Address")
 
+    # Date time field for the creation time
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Created")
+
     # Foreign key relation to the couple
     couple = models.ForeignKey(
         "core.Couple", verbose_name="Couple", on_delete=models.CASCADE
@@ -27,6 +74,9 @@ class House(BaseModel, ValidateCategoryCoupleMixin):
         "categories.Category", through="categories.Grade", verbose_name="Categories"
     )
 
+    # Set the manager for the model
+    objects = HouseQuerySet.as_manager()
+
     # String representation
     def __str__(self):
         return self.nickname
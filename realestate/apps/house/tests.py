@@ -0,0 +1,111 @@
+# Django imports
+from django.test import TestCase
+from django.urls import reverse
+
+
+# App imports
+from realestate.apps.categories.models import Category
+from realestate.apps.categories.models import Grade
+from realestate.apps.core.testing import create_homebuyer
+
+
+# Test case for the house evaluation page
+class HouseEvalViewTestCase(TestCase):
+    # Set the number of queries of the page and of the evaluation, whatever the number of categories
+    _GET_QUERY_COUNT = 6
+    _POST_QUERY_COUNT = 13
+
+    # Class method to create the homebuyers of the tests
+    @classmethod
+    def setUpTestData(cls):
+        # Run the backfill of the default weights and grades inside the test transaction
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.small_homebuyer = create_homebuyer("small", categories=5, houses=1)
+            cls.large_homebuyer = create_homebuyer("large", categories=50, houses=1)
+
+    # Protected method to log a homebuyer in and get their house, categories and evaluation url
+    def _evaluate(self, homebuyer):
+        # Log the homebuyer in
+        self.client.force_login(homebuyer.user)
+
+        # Get the house and the categories of the couple
+        house = homebuyer.couple.house_set.get()
+        category_ids = list(
+            Category.objects.filter(couple=homebuyer.couple).values_list(
+                "id", flat=True
+            )
+        )
+
+        # Return the house, the category ids and the url of the evaluation page
+        return (
+            house,
+            category_ids,
+            reverse("house-eval", kwargs={"house_id": house.id}),
+        )
+
+    # Protected method to get the evaluation page of a homebuyer in the fixed number of queries
+    def _assert_get_queries(self, homebuyer):
+        # Get the categories and the url of the evaluation page
+        _, category_ids, url = self._evaluate(homebuyer)
+
+        # Get the evaluation page
+        with self.assertNumQueries(self._GET_QUERY_COUNT):
+            response = self.client.get(url)
+
+        # Check the page grades every category
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["graded"]), len(category_ids))
+
+    # Protected method to post the evaluation of a homebuyer in the fixed number of queries
+    def _assert_post_queries(self, homebuyer):
+        # Get the house, the categories and the url of the evaluation page
+        house, category_ids, url = self._evaluate(homebuyer)
+
+        # Post an excellent score for every category
+        with self.assertNumQueries(self._POST_QUERY_COUNT):
+            response = self.client.post(
+                url, {str(category_id): 5 for category_id in category_ids}
+            )
+
+        # Check every grade is saved and evaluated
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(
+            Grade.objects.filter(house=house, homebuyer=homebuyer, score=5)
+            .evaluated()
+            .count(),
+            len(category_ids),
+        )
+
+    # Test the page of a homebuyer with a few categories
+    def test_small_get_query_count(self):
+        self._assert_get_queries(self.small_homebuyer)
+
+    # Test the page of a homebuyer with many categories
+    def test_large_get_query_count(self):
+        self._assert_get_queries(self.large_homebuyer)
+
+    # Test the evaluation of a homebuyer with a few categories
+    def test_small_post_query_count(self):
+        self._assert_post_queries(self.small_homebuyer)
+
+    # Test the evaluation of a homebuyer with many categories
+    def test_large_post_query_count(self):
+        self._assert_post_queries(self.large_homebuyer)
+
+    # Test only the categories posted in the form are evaluated
+    def test_post_partial_form(self):
+        # Get the house, the categories and the url of the evaluation page
+        house, category_ids, url = self._evaluate(self.large_homebuyer)
+
+        # Post a score for a single category
+        self.client.post(url, {str(category_ids[0]): 5})
+
+        # Check only the posted category is evaluated
+        self.assertEqual(
+            list(
+                Grade.objects.filter(house=house, homebuyer=self.large_homebuyer)
+                .evaluated()
+                .values_list("category_id", "score")
+            ),
+            [(category_ids[0], 5)],
+        )
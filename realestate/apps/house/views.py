@@ -4,9 +4,11 @@ import json
 
 # Django imports
 from django.contrib import messages
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.shortcuts import redirect
 from django.shortcuts import render
+from django.utils import timezone
 
 
 # App imports
@@ -17,8 +19,8 @@ from .models import House
 from realestate.apps.appauth.models import User
 from realestate.apps.categories.models import Category
 from realestate.apps.categories.models import Grade
+from realestate.apps.categories.models import HouseScore
 from realestate.apps.core.models import Couple
-from realestate.apps.core.models import Homebuyer
 from realestate.apps.core.views import BaseView
 
 
@@ -38,19 +40,15 @@ class HouseEditView(BaseView):
         # If the house id exists
         if house_id:
             # Get the houes for the house id
-            house = get_object_or_404(House.objects.filter(id=house_id))
+            house = get_object_or_404(House.objects.for_user(request.user), id=house_id)
 
-            # If the house exist
-            if house.couple.homebuyer_set.filter(user=request.user).exists():
-                # Populate the form with the house data
-                form = self.form_class(
-                    initial={"nickname": house.nickname, "address": house.address}
-                )
+            # Populate the form with the house data
+            form = self.form_class(
+                initial={"nickname": house.nickname, "address": house.address}
+            )
 
-                # Render the template
-                return render(
-                    request, self.template_name, {"form": form, "house": house}
-                )
+            # Render the template
+            return render(request, self.template_name, {"form": form, "house": house})
 
         # Redirect to the home page
         return redirect("home")
@@ -63,53 +61,49 @@ class HouseEditView(BaseView):
         # If the house id exists
         if house_id:
             # Get the house for the house id
-            house = get_object_or_404(House.objects.filter(id=house_id))
-
-            # If the house exist
-            if house.couple.homebuyer_set.filter(user=request.user).exists():
-                # Populate the form with the house data
-                form = self.form_class(request.POST)
-
-                # If the form is valid
-                if form.is_valid():
-                    # Get the cleaned data
-                    house.nickname = form.cleaned_data["nickname"]
-                    house.address = form.cleaned_data["address"]
-
-                    # Check if the nickname already exists
-                    exists = (
-                        House.objects.filter(nickname=house.nickname)
-                        .exclude(id=house.id)
-                        .exists()
-                    )
+            house = get_object_or_404(House.objects.for_user(request.user), id=house_id)
 
-                    # If the nickname already exists
-                    if exists:
-                        # Send a error message
-                        error = (
-                            f"House with nickname '{house.nickname}' already exists!"
-                        )
-                        messages.error(request, error)
+            # Populate the form with the house data
+            form = self.form_class(request.POST)
 
-                        # Redirect to the house edit page
-                        return redirect("house-edit", house_id=house.id)
+            # If the form is valid
+            if form.is_valid():
+                # Get the cleaned data
+                house.nickname = form.cleaned_data["nickname"]
+                house.address = form.cleaned_data["address"]
 
-                    # Save the house
-                    house.save()
+                # Check if the nickname already exists
+                exists = (
+                    House.objects.filter(
+                        couple_id=house.couple_id, nickname=house.nickname
+                    )
+                    .exclude(id=house.id)
+                    .exists()
+                )
 
-                    # Add a success message
-                    messages.success(request, "Your house has been updated!")
+                # If the nickname already exists
+                if exists:
+                    # Send a error message
+                    error = f"House with nickname '{house.nickname}' already exists!"
+                    messages.error(request, error)
 
                     # Redirect to the house edit page
                     return redirect("house-edit", house_id=house.id)
 
-                # Send a message that the form is invalid
-                messages.error(request, "Your form is invalid!")
+                # Save the house
+                house.save()
 
-                # Render the template
-                return render(
-                    request, self.template_name, {"form": form, "house": house}
-                )
+                # Add a success message
+                messages.success(request, "Your house has been updated!")
+
+                # Redirect to the house edit page
+                return redirect("house-edit", house_id=house.id)
+
+            # Send a message that the form is invalid
+            messages.error(request, "Your form is invalid!")
+
+            # Render the template
+            return render(request, self.template_name, {"form": form, "house": house})
 
         # Redirect to the home page
         return redirect("home")
@@ -131,19 +125,15 @@ class HouseDeleteView(BaseView):
         # If the house id exists
         if house_id:
             # Get the house
-            house = get_object_or_404(House.objects.filter(id=house_id))
+            house = get_object_or_404(House.objects.for_user(request.user), id=house_id)
 
-            # If the house exist
-            if house.couple.homebuyer_set.filter(user=request.user).exists():
-                # Populate the form with the house data
-                form = self.form_class(
-                    initial={"nickname": house.nickname, "address": house.address}
-                )
+            # Populate the form with the house data
+            form = self.form_class(
+                initial={"nickname": house.nickname, "address": house.address}
+            )
 
-                # Render the template
-                return render(
-                    request, self.template_name, {"house": house, "form": form}
-                )
+            # Render the template
+            return render(request, self.template_name, {"house": house, "form": form})
 
         # Render empty template
         return render(request, self.template_name, {})
@@ -156,18 +146,16 @@ class HouseDeleteView(BaseView):
         # If the house id exists
         if house_id:
             # Get the house for the house id
-            house = get_object_or_404(House.objects.filter(id=house_id))
+            house = get_object_or_404(House.objects.for_user(request.user), id=house_id)
 
-            # If the house exist
-            if house.couple.homebuyer_set.filter(user=request.user).exists():
-                # Delete the house
-                house.delete()
+            # Delete the house
+            house.delete()
 
-                # Send a success message
-                messages.success(request, "Your house has been deleted!")
+            # Send a success message
+            messages.success(request, "Your house has been deleted!")
 
-                # Redirect to the home page
-                return redirect("home")
+            # Redirect to the home page
+            return redirect("home")
 
         # Send an error message
         messages.error(request, "Your house could not be deleted!")
@@ -200,11 +188,13 @@ class HouseAddView(BaseView):
 
         # If the nickname and address exists
         if nickname and address:
-            # Get the couple for the user
-            couple = Couple.objects.filter(homebuyer__user=request.user).first()
+            # Get the couple id of the homebuyer from the request
+            couple_id = request.couple_id
 
             # Check if the nickname already exists
-            exists = House.objects.filter(couple=couple, nickname=nickname).exists()
+            exists = House.objects.filter(
+                couple_id=couple_id, nickname=nickname
+            ).exists()
 
             # If the nickname already exists
             if exists:
@@ -219,7 +209,7 @@ class HouseAddView(BaseView):
             house = House.objects.create(
                 nickname=nickname,
                 address=address,
-                couple=couple,
+                couple_id=couple_id,
             )
 
             # Send a success message
@@ -286,8 +276,8 @@ class HouseEvalView(BaseView):
 
     # Method to handle the get request
     def get(self, request, *args, **kwargs):
-        # Get the homebuyer for the user
-        homebuyer = Homebuyer.objects.get(user=request.user)
+        # Get the homebuyer of the user
+        homebuyer = request.role
 
         # Get the house for the house id
         house = get_object_or_404(House, id=kwargs["house_id"])
@@ -296,22 +286,23 @@ class HouseEvalView(BaseView):
         couple = homebuyer.couple
 
         # Get the categories for the couple
-        categories = Category.objects.filter(couple__id=couple.id)
-
-        # Filter the grades for the house and user
-        grades = Grade.objects.filter(house=house, homebuyer=homebuyer)
-
-        # Map the categories to the grades
-        graded = {}
-        for category in categories:
-            missing = True
-            for grade in grades:
-                if grade.category.id == category.id:
-                    graded[category] = grade.score
-                    missing = False
-                    break
-            if missing:
-                graded[category] = 3
+        categories = list(Category.objects.filter(couple__id=couple.id))
+
+        # Get the scores of the homebuyer for the house keyed by category id
+        scores = dict(
+            Grade.objects.filter(house=house, homebuyer=homebuyer)
+            .order_by()
+            .values_list("category_id", "score")
+        )
+
+        # Get the default score for the missing grades
+        default_score = Grade._meta.get_field("score").default
+
+        # Map the categories to the scores
+        graded = {
+            str(category.id): scores.get(category.id, default_score)
+            for category in categories
+        }
 
         # Populate the form
         eval_form = self.form_class(extra_fields=graded, categories=categories)
@@ -332,8 +323,8 @@ class HouseEvalView(BaseView):
 
     # Method to handle the post request
     def post(self, request, *args, **kwargs):
-        # Get the homebuyer for the user
-        homebuyer = Homebuyer.objects.get(user=request.user)
+        # Get the homebuyer of the user
+        homebuyer = request.role
 
         # Get the couple for the user
         couple = homebuyer.couple
@@ -344,23 +335,71 @@ class HouseEvalView(BaseView):
         # Get the cateogries for the couple
         categories = Category.objects.filter(couple=couple)
 
-        # Traverse the categories
-        for category in categories:
-            # Get the id and score for the category
-            id = category.id
-            score = request.POST.get(str(category), 3)
-
-            # Get the category for the id
-            category = Category.objects.get(id=id)
-
-            # Update/Create the grade
-            grade, created = Grade.objects.update_or_create(
-                homebuyer=homebuyer,
-                category=category,
-                house=house,
-                defaults={"score": int(score)},
+        # Get the submitted scores, the categories missing from the form are not evaluated
+        scores = {
+            category.id: int(request.POST[str(category.id)])
+            for category in categories
+            if str(category.id) in request.POST
+        }
+
+        # Get the time of the evaluation
+        now = timezone.now()
+
+        # Create a database transaction
+        with transaction.atomic():
+            # Lock the house score, so concurrent evaluations of the house apply their changes in turn
+            list(
+                HouseScore.objects.select_for_update()
+                .filter(house=house, homebuyer=homebuyer)
+                .order_by()
+                .values_list("id")
             )
 
+            # Get the saved scores of the homebuyer for the house and the evaluated categories
+            saved_scores = {}
+            evaluated = set()
+            for category_id, score, evaluated_at in (
+                Grade.objects.select_for_update()
+                .filter(house=house, homebuyer=homebuyer)
+                .order_by()
+                .values_list("category_id", "score", "evaluated")
+            ):
+                saved_scores[category_id] = score
+                if evaluated_at is not None:
+                    evaluated.add(category_id)
+
+            # Get the scores that are new, changed or not evaluated yet
+            changes = {
+                category_id: (saved_scores.get(category_id), score)
+                for category_id, score in scores.items()
+                if saved_scores.get(category_id) != score
+                or category_id not in evaluated
+            }
+
+            # Upsert the changed grades in a single query
+            Grade.objects.bulk_create(
+                [
+                    Grade(
+                        house=house,
+                        category_id=category_id,
+                        homebuyer=homebuyer,
+                        score=score,
+                        evaluated=now,
+                    )
+                    for category_id, (_, score) in changes.items()
+                ],
+                update_conflicts=True,
+                unique_fields=["house", "category", "homebuyer"],
+                update_fields=["score", "evaluated"],
+            )
+
+            # Apply the changes to the house score
+            HouseScore.objects.apply_grade_changes(homebuyer.id, house.id, changes)
+
+            # If grades changed or were evaluated, bump the version of the couple
+            if changes:
+                Couple.objects.filter(id=homebuyer.couple_id).bump_version()
+
         # Send a success message
         messages.success(request, "Your evaluation has been saved!")
 
@@ -30,6 +30,9 @@ class PendingCouple(BaseModel):
         "core.Realtor", verbose_name="Realtor", on_delete=models.CASCADE
     )
 
+    # Date time field for the creation time
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Created")
+
     # String representation
     def __str__(self):
         pending_homebuyers = self.pendinghomebuyer_set.all()
@@ -71,6 +74,9 @@ class PendingCouple(BaseModel):
         # Set field to be used for ordering
         ordering = ["realtor"]
 
+        # Set the index for the realtor client list
+        indexes = [models.Index(fields=["realtor", "created"])]
+
         # Set the verbose names
         verbose_name = "Pending Couple"
         verbose_name_plural = "Pending Couples"
@@ -147,20 +153,22 @@ class PendingHomebuyer(BaseModel):
     # Method to get the partner
     @property
     def partner(self):
-        # Get the pending homebuyers
-        pending_homebuyers = self.pending_couple.pendinghomebuyer_set.exclude(
-            id=self.id
+        # Get up to two other pending homebuyers in a single query
+        pending_homebuyers = list(
+            PendingHomebuyer.objects.filter(
+                pending_couple_id=self.pending_couple_id
+            ).exclude(id=self.id)[:2]
         )
 
-        # If the pending homebuyers is greater than 1
-        if pending_homebuyers.count() > 1:
+        # If there is more than 1 other pending homebuyer
+        if len(pending_homebuyers) > 1:
             # Raise the integrity error
             raise IntegrityError(
                 f"PendingCouple has too many related PendingHomebuyer and should be resolved immediately. (PendingCouple ID: {self.pending_couple.id})"
             )
 
-        # Else return the first member of the pending homebuyers
-        return pending_homebuyers.first()
+        # Else return the other pending homebuyer, if any
+        return pending_homebuyers[0] if pending_homebuyers else None
 
     # Method to check if the homebuyer is registered
     @property
@@ -85,7 +85,7 @@ class InviteHomebuyerView(BaseView):
             with transaction.atomic():
                 # Create a pending couple with the pending users
                 pending_couple = PendingCouple.objects.create(
-                    realtor=request.user.realtor,
+                    realtor=request.role,
                 )
 
                 # Send the invitations to both the homebuyers
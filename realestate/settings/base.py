@@ -58,11 +58,19 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "realestate.apps.appauth.middleware.RoleMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 
+# Authentication backends, the model backend is kept for the existing sessions
+AUTHENTICATION_BACKENDS = [
+    "realestate.apps.appauth.backends.RoleModelBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+
 # Root URL configuration
 ROOT_URLCONF = "realestate.urls"
 
@@ -143,3 +151,19 @@ LOGGING = {
 # Login redirect URL
 LOGIN_REDIRECT_URL = "home"
 LOGIN_URL = "login"
+
+
+# Read missing grades as the default score instead of creating default grades
+LAZY_GRADES = False
+
+
+# Cache configuration
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+
+# Seconds to keep the cached couple data, the couple version invalidates it exactly
+COUPLE_CACHE_TIMEOUT = 60 * 60 * 24